@@ -27,6 +27,9 @@ def main(
     model_name: str = typer.Argument("all", help="Name of the model to run"),
     max_events: int = typer.Option(10, help="Maximum number of events to analyze"),
     days_ahead: int = typer.Option(7 * 6, help="Days until event ending"),
+    max_concurrency: int = typer.Option(
+        4, help="Maximum number of agent runs executed at the same time"
+    ),
 ):
     """Main script to run investment analysis with a single model."""
 
@@ -63,6 +66,7 @@ def main(
         max_n_events=max_events,
         models=models,
         output_path=DATA_PATH,
+        max_concurrency=max_concurrency,
     )
 
     logger.info(f"Analysis completed. Results: {results}")
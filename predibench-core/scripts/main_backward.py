@@ -34,6 +34,9 @@ def main(
     weeks_back: int = typer.Option(
         4, help="Number of weeks to go back for backward mode"
     ),
+    max_concurrency: int = typer.Option(
+        4, help="Maximum number of agent runs executed at the same time"
+    ),
 ):
     """Main script to run investment analysis with all models across past weeks."""
 
@@ -69,6 +72,7 @@ def main(
             target_date=target_date,
             dataset_name="m-ric/predibench-agent-choices",
             split="train",
+            max_concurrency=max_concurrency,
         )
 
     logger.info(f"All analyses completed. Total results: {len(all_results)}")
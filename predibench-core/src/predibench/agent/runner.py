@@ -1,12 +1,25 @@
-import json
+import atexit
+import logging
 import os
+import tempfile
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
 from datetime import date, datetime
+from functools import cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import datasets
+import httpx
 import numpy as np
-from datasets import Dataset, concatenate_datasets, load_dataset
+import orjson
+import pandas as pd
 from dotenv import load_dotenv
+from huggingface_hub import DatasetCard, HfApi, hf_hub_download
+from huggingface_hub.errors import (
+    EntryNotFoundError,
+    HfHubHTTPError,
+    RepositoryNotFoundError,
+)
 from predibench.agent.dataclasses import (
     EventInvestmentDecisions,
     MarketInvestmentDecision,
@@ -21,12 +34,251 @@ from predibench.date_utils import is_backward_mode
 from predibench.logger_config import get_logger
 from predibench.polymarket_api import Event
 from predibench.storage_utils import write_to_storage
+from pydantic import TypeAdapter
 from smolagents import ApiModel
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+if TYPE_CHECKING:
+    from datasets import Dataset, Features
 
 load_dotenv()
 
 logger = get_logger(__name__)
 
+_MODEL_RESULT_ADAPTER = TypeAdapter(ModelInvestmentDecisions)
+
+
+def _is_transient_hub_error(error: BaseException) -> bool:
+    """Network errors, rate limits and server errors can succeed on retry, unlike e.g. 401/403/404."""
+    if isinstance(error, HfHubHTTPError):
+        status_code = error.response.status_code
+        return status_code == 429 or status_code >= 500
+    return isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError))
+
+
+# Uploads happen after agents have run, so transient Hub errors are retried rather than
+# losing the results
+hf_upload_retry = retry(
+    stop=stop_after_attempt(6),
+    wait=wait_exponential(multiplier=1, max=60),
+    retry=retry_if_exception(_is_transient_hub_error),
+    before_sleep=before_sleep_log(logger, log_level=logging.WARNING),
+    reraise=True,
+)
+
+# Uploads run in the background, one at a time since each one updates the dataset card,
+# and are waited for before the interpreter exits
+_UPLOAD_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hf-upload")
+atexit.register(_UPLOAD_EXECUTOR.shutdown, wait=True)
+
+# Explicit schema of the uploaded rows, so that Arrow does not have to infer it
+HF_DATASET_COLUMN_TYPES = {
+    "model_id": "string",
+    "agent_name": "string",
+    "target_date": "date32",
+    "date": "date32",
+    "event_id": "string",
+    "event_title": "string",
+    "event_description": "string",
+    "decisions_per_market": "string",
+    "timestamp_uploaded": "timestamp[us]",
+}
+
+_CAPITAL_ALLOCATION_RULES = """
+CAPITAL ALLOCATION RULES:
+- You have exactly 1.0 dollars to allocate. Negative bets can be done to short the market, but they still count in absolute value towards the 1.0 dollar allocation.
+- For EACH market, specify your bet. Provide:
+1. market_id: The market ID
+2. rationale: Explanation for your decision
+4. odds: The odds you think the market will settle at
+3. bet: The amount you bet on this market (can be negative if you want to short the market, e.g. if it's overpriced)
+- The sum of ALL (absolute value of bets) + unallocated_capital must equal 1.0
+- You can choose not to bet on markets with poor edges by setting bets summing to lower than 1 and a non-zero unallocated_capital
+
+Example: If you bet 0.3 on market A, 0.2 on market B, and nothing on market C, your unallocated_capital should be 0.5.
+"""
+
+_MARKET_SUMMARY_TEMPLATE = """
+Market ID: {id}
+Question: {question}
+Description: {description}
+Historical prices for the outcome "{price_outcome_name}":
+{recent_prices}
+Last available price for "{price_outcome_name}": {current_price}
+        """
+
+
+@cache
+def get_hf_dataset_features() -> "Features":
+    """Features of the uploaded rows, built on first upload.
+
+    datasets (and pyarrow) are only imported here and in the upload functions,
+    as they take a large part of the import time of this module.
+    """
+    from datasets import Features, Value
+
+    return Features(
+        {name: Value(dtype) for name, dtype in HF_DATASET_COLUMN_TYPES.items()}
+    )
+
+
+def _json_default(obj):
+    return obj.model_dump() if hasattr(obj, "model_dump") else obj
+
+
+def _build_hf_columns(
+    results_per_model: list[ModelInvestmentDecisions],
+    target_date: date,
+    current_timestamp: datetime,
+) -> dict[str, list]:
+    """Build the HF dataset columns, with one row per (model, event) decision."""
+    columns = {name: [] for name in HF_DATASET_COLUMN_TYPES}
+    for model_investment_decision in results_per_model:
+        event_investment_decisions = (
+            model_investment_decision.event_investment_decisions
+        )
+        n_events = len(event_investment_decisions)
+        # ModelInvestmentResult fields
+        columns["model_id"] += [model_investment_decision.model_id] * n_events
+        # Keep for backward compatibility
+        columns["agent_name"] += [model_investment_decision.model_id] * n_events
+        columns["target_date"] += [model_investment_decision.target_date] * n_events
+        # Keep for backward compatibility
+        columns["date"] += [target_date] * n_events
+        for event_investment_decision in event_investment_decisions:
+            # EventInvestmentResult fields
+            columns["event_id"].append(event_investment_decision.event_id)
+            columns["event_title"].append(event_investment_decision.event_title)
+            columns["event_description"].append(
+                event_investment_decision.event_description
+            )
+            # MarketInvestmentResult fields
+            columns["decisions_per_market"].append(
+                orjson.dumps(
+                    event_investment_decision.market_investment_decisions,
+                    default=_json_default,
+                ).decode()
+            )
+    columns["timestamp_uploaded"] = [current_timestamp] * len(columns["model_id"])
+    return columns
+
+
+def _get_dataset_card(dataset_name: str) -> tuple[DatasetCard | None, str | None]:
+    """Load the dataset card of an existing HF dataset, with the commit sha it was read at.
+
+    The card is None if there is none yet, the sha is None if the dataset does not exist.
+    """
+    try:
+        sha = hf_upload_retry(HfApi().dataset_info)(dataset_name).sha
+    except RepositoryNotFoundError:
+        return None, None
+    try:
+        card_path = hf_upload_retry(hf_hub_download)(
+            dataset_name, "README.md", repo_type="dataset", revision=sha
+        )
+    except EntryNotFoundError:
+        return None, sha
+    return DatasetCard.load(card_path), sha
+
+
+def _is_commit_conflict(error: BaseException) -> bool:
+    """The Hub rejects a commit whose parent_commit is no longer the head of the repo."""
+    return isinstance(error, HfHubHTTPError) and error.response.status_code == 412
+
+
+def _split_has_files(dataset_name: str, split: str) -> bool:
+    """Check if the HF dataset already holds data files for a split."""
+    try:
+        repo_files = hf_upload_retry(HfApi().list_repo_files)(
+            dataset_name, repo_type="dataset"
+        )
+    except RepositoryNotFoundError:
+        return False
+    # Pattern of the files written by push_to_hub and of the appended shards
+    return any(file.startswith(f"data/{split}-") for file in repo_files)
+
+
+def _get_card_features(card: DatasetCard) -> "Features | None":
+    """Read the features recorded in the card metadata by push_to_hub."""
+    from datasets.info import DatasetInfosDict
+
+    for dataset_info in DatasetInfosDict.from_dataset_card_data(card.data).values():
+        if dataset_info.features is not None:
+            return dataset_info.features
+    return None
+
+
+def _increment_split_size(card: DatasetCard, split: str, n_new_rows: int) -> bool:
+    """Add n_new_rows to the recorded size of a split in the card metadata.
+
+    Returns False if the split is not declared in the card.
+    """
+    dataset_infos = card.data.get("dataset_info")
+    if dataset_infos is None:
+        return False
+    if not isinstance(dataset_infos, list):
+        dataset_infos = [dataset_infos]
+    for dataset_info in dataset_infos:
+        for split_info in dataset_info.get("splits", []):
+            if split_info["name"] == split:
+                # NOTE: load_dataset checks the number of examples per split against the card
+                split_info["num_examples"] += n_new_rows
+                return True
+    return False
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    retry=retry_if_exception(_is_commit_conflict),
+    before_sleep=before_sleep_log(logger, log_level=logging.WARNING),
+    reraise=True,
+)
+def _append_to_split(
+    new_dataset: "Dataset", features: "Features", dataset_name: str, split: str
+) -> None:
+    """Upload rows as a new shard of an existing split, and update its size in the dataset card.
+
+    On a concurrent commit to the dataset, the card is read again and the upload retried.
+    """
+    n_new_rows = len(new_dataset)
+    card, sha = _get_dataset_card(dataset_name)
+    if card is None or not _increment_split_size(card, split, n_new_rows):
+        raise ValueError(
+            f"Split '{split}' of dataset {dataset_name} has data files but its dataset card "
+            "does not record its size: cannot append rows without overwriting them"
+        )
+
+    # All shards of a split must share one schema for the split to load
+    existing_features = _get_card_features(card)
+    if existing_features is not None and existing_features != features:
+        logger.warning(
+            f"Dataset {dataset_name} schema differs from HF_DATASET_COLUMN_TYPES, casting new rows to it"
+        )
+        new_dataset = new_dataset.cast(existing_features)
+
+    # Shard name matches the "data/{split}-*" pattern declared by push_to_hub
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        shard_path = Path(tmp_dir) / "data" / f"{split}-{uuid.uuid4()}.parquet"
+        shard_path.parent.mkdir(parents=True)
+        new_dataset.to_parquet(shard_path)
+        card.save(Path(tmp_dir) / "README.md")
+
+        logger.info(f"Appending {n_new_rows} rows as a new shard")
+        hf_upload_retry(HfApi().upload_folder)(
+            repo_id=dataset_name,
+            folder_path=tmp_dir,
+            repo_type="dataset",
+            commit_message=f"Append {n_new_rows} rows to split '{split}'",
+            # Fails on a concurrent commit, instead of overwriting its split size with a stale one
+            parent_commit=sha,
+        )
+
 
 def _upload_results_to_hf_dataset(
     results_per_model: list[ModelInvestmentDecisions],
@@ -35,81 +287,79 @@ def _upload_results_to_hf_dataset(
     split: str = "train",
     erase_existing: bool = False,
 ) -> None:
-    """Upload investment results to the Hugging Face dataset."""
-    # Try to load the existing dataset, handle empty dataset case
-    try:
-        ds = load_dataset(dataset_name)
-    except datasets.data_files.EmptyDatasetError:
-        logger.info(f"Dataset {dataset_name} is empty, will create with new data")
-        ds = None
+    """Upload investment results to the Hugging Face dataset.
 
-    # Prepare new data rows
-    new_rows = []
-    current_timestamp = datetime.now()
+    New rows are appended as a single parquet shard next to the existing ones,
+    so the existing dataset is never downloaded nor re-uploaded.
+    """
+    n_new_rows = sum(
+        len(model_investment_decision.event_investment_decisions)
+        for model_investment_decision in results_per_model
+    )
+    if n_new_rows == 0:
+        logger.warning("No data to upload to HF dataset")
+        return
 
-    for model_investment_decision in results_per_model:
-        for (
-            event_investment_decision
-        ) in model_investment_decision.event_investment_decisions:
-            row = {
-                # ModelInvestmentResult fields
-                "model_id": model_investment_decision.model_id,
-                "agent_name": model_investment_decision.model_id,  # Keep for backward compatibility
-                "target_date": model_investment_decision.target_date,
-                "date": target_date,  # Keep for backward compatibility
-                # EventInvestmentResult fields
-                "event_id": event_investment_decision.event_id,
-                "event_title": event_investment_decision.event_title,
-                "event_description": event_investment_decision.event_description,
-                # MarketInvestmentResult fields
-                "decisions_per_market": json.dumps(
-                    event_investment_decision.market_investment_decisions,
-                    default=lambda obj: obj.model_dump()
-                    if hasattr(obj, "model_dump")
-                    else obj,
-                ),
-                "timestamp_uploaded": current_timestamp,
-            }
-            new_rows.append(row)
-
-    if new_rows:
-        # Create a new dataset with the new rows
-        new_dataset = Dataset.from_list(new_rows)
-        # Concatenate with existing dataset using datasets.concatenate_datasets
-
-        # Handle dataset combination based on erase_existing flag
-        if erase_existing or ds is None:
-            # Either erasing existing data or dataset is empty, just use new data
-            combined_dataset = new_dataset
-            if erase_existing:
-                logger.info(
-                    f"Erasing existing dataset and creating fresh dataset with {len(new_dataset)} rows"
-                )
-            else:
-                logger.info(f"Dataset is empty, creating with {len(new_dataset)} rows")
-        else:
-            try:
-                existing_data = ds[split]
-                combined_dataset = concatenate_datasets([existing_data, new_dataset])
-                logger.info(
-                    f"Appending {len(new_dataset)} rows to existing {len(existing_data)} rows"
-                )
-            except KeyError:
-                # Split doesn't exist, just use new data
-                combined_dataset = new_dataset
-                logger.info(
-                    f"Split '{split}' doesn't exist, creating with {len(new_dataset)} rows"
-                )
+    import pyarrow as pa
+    from datasets import Dataset, DatasetInfo
 
-        # Push back to hub as a pull request (safer approach)
-        combined_dataset.push_to_hub(
-            dataset_name,
-            split=split,
-        )
+    features = get_hf_dataset_features()
+    # Built column by column straight into Arrow with the fixed schema, without type inference
+    new_table = pa.Table.from_pydict(
+        _build_hf_columns(
+            results_per_model=results_per_model,
+            target_date=target_date,
+            current_timestamp=datetime.now(),
+        ),
+        schema=features.arrow_schema,
+    )
+    new_dataset = Dataset(new_table, info=DatasetInfo(features=features))
 
-        logger.info(f"Successfully uploaded {len(new_rows)} new rows to HF dataset")
+    if erase_existing or not _split_has_files(dataset_name, split):
+        # push_to_hub replaces all the files of the split, so it is only used when there are none to keep
+        if erase_existing:
+            logger.info(
+                f"Erasing existing dataset and creating fresh dataset with {n_new_rows} rows"
+            )
+        else:
+            logger.info(
+                f"Split '{split}' doesn't exist, creating with {n_new_rows} rows"
+            )
+        hf_upload_retry(new_dataset.push_to_hub)(dataset_name, split=split)
     else:
-        logger.warning("No data to upload to HF dataset")
+        _append_to_split(new_dataset, features, dataset_name, split)
+
+    logger.info(f"Successfully uploaded {n_new_rows} new rows to HF dataset")
+
+
+def _log_upload_error(upload: Future) -> None:
+    if upload.exception() is not None:
+        logger.error("Upload to HF dataset failed", exc_info=upload.exception())
+
+
+def _submit_upload(
+    results_per_model: list[ModelInvestmentDecisions],
+    target_date: date,
+    dataset_name: str,
+    split: str,
+) -> Future:
+    """Queue an upload of results to the HF dataset, to run in the background."""
+    upload = _UPLOAD_EXECUTOR.submit(
+        _upload_results_to_hf_dataset,
+        results_per_model=results_per_model,
+        target_date=target_date,
+        dataset_name=dataset_name,
+        split=split,
+    )
+    upload.add_done_callback(_log_upload_error)
+    return upload
+
+
+def wait_for_uploads(uploads: list[Future]) -> None:
+    """Wait for background uploads to the HF dataset, re-raising the first error if any failed."""
+    wait(uploads)
+    for upload in uploads:
+        upload.result()
 
 
 def save_model_result(
@@ -122,26 +372,31 @@ def save_model_result(
     filename = f"{model_result.model_id.replace('/', '--')}_{timestamp_for_saving}.json"
     filepath = date_output_path / filename
 
-    content = model_result.model_dump_json(indent=2)
+    # Serialize straight to UTF-8 bytes, skipping the intermediate str
+    content = _MODEL_RESULT_ADAPTER.dump_json(model_result, indent=2)
     write_to_storage(filepath, content)
 
     logger.info(f"Saved model result to {filepath}")
 
 
-def _process_event_investment(
-    model: ApiModel | str,
+def _format_prices(prices: pd.Series) -> str:
+    """Render a price series as one "YYYY-MM-DD  price" line per date."""
+    return "\n".join(f"{day:%Y-%m-%d}  {price:.4f}" for day, price in prices.items())
+
+
+def _build_event_prompt(
     event: Event,
     target_date: date,
-    date_output_path: Path | None,
-    timestamp_for_saving: str,
+    backward_mode: bool,
     price_history_limit: int = 20,
-) -> EventInvestmentDecisions:
-    """Process investment decisions for all relevant markets."""
-    logger.info(f"Processing event: {event.title} with {len(event.markets)} markets")
-    backward_mode = is_backward_mode(target_date)
+) -> tuple[str, dict[str, dict]]:
+    """Build the investment prompt for an event, along with the market data it describes.
 
+    The prompt does not depend on the model, so it is built once per event and shared by all models.
+    """
     # Prepare market data for all markets
     market_data = {}
+    market_summaries = []
 
     for market in event.markets:
         if market.prices is None:
@@ -149,92 +404,69 @@ def _process_event_investment(
                 "markets are supposed to be filtered, this should not be possible"
             )
         # Check if market is closed and get price data
-        if market.prices is not None and target_date in market.prices.index:
+        is_closed = target_date not in market.prices.index
+        if not is_closed:
             if backward_mode:
                 price_data = market.prices.loc[:target_date].dropna()
             else:
                 price_data = market.prices.dropna()
-            # Limit price history
-            if len(price_data) > price_history_limit:
-                price_data = price_data.tail(price_history_limit)
-            recent_prices = price_data.to_string(index=True, header=False)
             current_price = float(market.prices.loc[target_date])
-            is_closed = False
         else:
             # Market is closed - get all available historical prices
-            if market.prices is not None and len(market.prices) > 0:
-                price_data = market.prices.dropna()
-                # Limit price history
-                if len(price_data) > price_history_limit:
-                    price_data = price_data.tail(price_history_limit)
-                recent_prices = price_data.to_string(index=True, header=False)
-                current_price = float(market.prices.dropna().iloc[-1])
-            else:
-                recent_prices = "No price data available"
-                current_price = None
-            is_closed = True
+            price_data = market.prices.dropna()
+            current_price = float(price_data.iloc[-1]) if len(price_data) > 0 else None
+
+        if len(price_data) > 0:
+            # Limit price history
+            recent_prices = _format_prices(price_data.tail(price_history_limit))
+        else:
+            recent_prices = "No price data available"
 
         market_info = {
             "id": market.id,
             "question": market.question,
-            "description": market.description,
+            "description": market.description or "No description",
             "recent_prices": recent_prices,
             "current_price": current_price,
             "is_closed": is_closed,
-            "price_outcome_name": market.price_outcome_name or "Unknown outcome",
+            "price_outcome_name": market.display_outcome_name,
         }
         market_data[market.id] = market_info
+        market_summaries.append(_MARKET_SUMMARY_TEMPLATE.format_map(market_info))
 
-    # Create summaries for all markets
-    market_summaries = []
-
-    for market_info in market_data.values():
-        outcome_name = market_info["price_outcome_name"]
-
-        summary = f"""
-Market ID: {market_info["id"]}
-Question: {market_info["question"]}
-Description: {market_info["description"] or "No description"}
-Historical prices for the outcome "{outcome_name}":
-{market_info["recent_prices"]}
-Last available price for "{outcome_name}": {market_info["current_price"]}
-        """
-        market_summaries.append(summary)
-
-    full_question = f"""
+    # Event-specific context goes after the invariant rules, so that providers can cache the shared prefix
+    full_question = f"""{_CAPITAL_ALLOCATION_RULES}
 Date: {target_date.strftime("%B %d, %Y")}
 
 Event: {event.title}
 
 You have access to {len(market_data)} markets related to this event. You must allocate your capital across these markets.
 
-CAPITAL ALLOCATION RULES:
-- You have exactly 1.0 dollars to allocate. Negative bets can be done to short the market, but they still count in absolute value towards the 1.0 dollar allocation.
-- For EACH market, specify your bet. Provide:
-1. market_id: The market ID
-2. rationale: Explanation for your decision
-4. odds: The odds you think the market will settle at
-3. bet: The amount you bet on this market (can be negative if you want to short the market, e.g. if it's overpriced)
-- The sum of ALL (absolute value of bets) + unallocated_capital must equal 1.0
-- You can choose not to bet on markets with poor edges by setting bets summing to lower than 1 and a non-zero unallocated_capital
-
 AVAILABLE MARKETS:
 {"".join(market_summaries)}
-
-Example: If you bet 0.3 on market A, 0.2 on market B, and nothing on market C, your unallocated_capital should be 0.5.
     """
+    return full_question, market_data
 
-    # Save prompt to file if date_output_path is provided
-    if date_output_path:
-        model_id = model.model_id if isinstance(model, ApiModel) else model
-        prompt_file = (
-            date_output_path
-            / model_id.replace("/", "--")
-            / f"prompt_event_{event.id}_{timestamp_for_saving}.txt"
-        )
 
-        write_to_storage(prompt_file, full_question)
-        logger.info(f"Saved prompt to {prompt_file}")
+@cache
+def _get_env_var(name: str) -> str:
+    """Read a required environment variable, once per process."""
+    value = os.getenv(name)
+    if not value:
+        raise ValueError(f"Environment variable {name} is not set")
+    return value
+
+
+def _process_event_investment(
+    model: ApiModel | str,
+    event: Event,
+    target_date: date,
+    full_question: str,
+    market_data: dict[str, dict],
+    backward_mode: bool,
+) -> EventInvestmentDecisions:
+    """Process investment decisions for all relevant markets."""
+    logger.info(f"Processing event: {event.title} with {len(event.markets)} markets")
 
     if isinstance(model, str) and model == "test_random":
         # Create random decisions for all markets with capital allocation constraint
@@ -242,22 +474,24 @@ Example: If you bet 0.3 on market A, 0.2 on market B, and nothing on market C, y
         market_decisions = []
         per_event_allocation = 1.0
 
+        rng = np.random.default_rng()
         number_markets = len(market_data)
-        invested_values = np.random.random(number_markets)
+        invested_values = rng.random(number_markets)
         invested_values = (
             per_event_allocation * invested_values / np.sum(invested_values)
         )  # Random numbers that sum to per_event_allocation
+        odds_values = rng.uniform(0.1, 0.9, number_markets)
 
-        for market_info, invested_value in zip(market_data.values(), invested_values):
-            amount = invested_value
-
+        for market_id, invested_value, odds in zip(
+            market_data, invested_values.tolist(), odds_values.tolist()
+        ):
             model_decision = SingleModelDecision(
-                rationale=f"Random decision for testing market {market_info['id']}",
-                odds=np.random.uniform(0.1, 0.9),
-                bet=amount,
+                rationale=f"Random decision for testing market {market_id}",
+                odds=odds,
+                bet=invested_value,
             )
             market_decision = MarketInvestmentDecision(
-                market_id=market_info["id"],
+                market_id=market_id,
                 model_decision=model_decision,
             )
             market_decisions.append(market_decision)
@@ -274,7 +508,7 @@ Example: If you bet 0.3 on market A, 0.2 on market B, and nothing on market C, y
             question=full_question,
             cutoff_date=target_date if backward_mode else None,
             search_provider="serper",
-            search_api_key=os.getenv("SERPER_API_KEY"),
+            search_api_key=_get_env_var("SERPER_API_KEY"),
             max_steps=20,
         )
     for market_decision in market_decisions:
@@ -295,25 +529,32 @@ Example: If you bet 0.3 on market A, 0.2 on market B, and nothing on market C, y
 def _process_single_model(
     model: ApiModel | str,
     events: list[Event],
+    event_futures: list[Future],
     target_date: date,
     date_output_path: Path | None,
     timestamp_for_saving: str,
+    dataset_name: str | None,
+    split: str,
+    uploads: list[Future],
 ) -> ModelInvestmentDecisions:
-    """Process investments for all events for a model."""
-    all_event_decisions = []
-
-    for event in events:
-        logger.info(f"Processing event: {event.title}")
-        event_decisions = _process_event_investment(
-            model=model,
-            event=event,
-            target_date=target_date,
-            date_output_path=date_output_path,
-            timestamp_for_saving=timestamp_for_saving,
-        )
-        all_event_decisions.append(event_decisions)
+    """Gather the investments of a model from its finished event runs, then save and upload them.
 
+    Failed events are logged and skipped, so that they do not discard the other events of the model.
+    The model's results are uploaded as soon as it is done, without waiting for the other models:
+    the upload is added to uploads, to be waited for by the caller.
+    """
     model_id = model.model_id if isinstance(model, ApiModel) else model
+
+    all_event_decisions = []
+    for event, future in zip(events, event_futures):
+        error = future.exception()
+        if error is not None:
+            logger.error(
+                f"Event {event.id} failed with model {model_id}", exc_info=error
+            )
+            continue
+        all_event_decisions.append(future.result())
+
     model_result = ModelInvestmentDecisions(
         model_id=model_id,
         target_date=target_date,
@@ -326,9 +567,93 @@ def _process_single_model(
             date_output_path=date_output_path,
             timestamp_for_saving=timestamp_for_saving,
         )
+    if dataset_name:
+        uploads.append(
+            _submit_upload(
+                results_per_model=[model_result],
+                target_date=target_date,
+                dataset_name=dataset_name,
+                split=split,
+            )
+        )
     return model_result
 
 
+def _process_all_models(
+    models: list[ApiModel | str],
+    events: list[Event],
+    event_prompts: dict[str, tuple[str, dict[str, dict]]],
+    target_date: date,
+    date_output_path: Path | None,
+    timestamp_for_saving: str,
+    backward_mode: bool,
+    max_concurrency: int,
+    dataset_name: str | None,
+    split: str,
+    uploads: list[Future],
+) -> list[ModelInvestmentDecisions]:
+    """Run all (model, event) pairs concurrently, at most max_concurrency at a time.
+
+    Agents are synchronous, so each pair runs in a worker thread. A model is saved and uploaded
+    as soon as all its events are done. A model whose run fails is logged and left out of
+    the results, so that it does not discard the results of the other models.
+    """
+    results = {}
+
+    def finish_model(model_index: int, event_futures: list[Future]) -> None:
+        model = models[model_index]
+        try:
+            results[model_index] = _process_single_model(
+                model=model,
+                events=events,
+                event_futures=event_futures,
+                target_date=target_date,
+                date_output_path=date_output_path,
+                timestamp_for_saving=timestamp_for_saving,
+                dataset_name=dataset_name,
+                split=split,
+                uploads=uploads,
+            )
+        except Exception:
+            model_id = model.model_id if isinstance(model, ApiModel) else model
+            logger.error(f"Model {model_id} failed", exc_info=True)
+
+    with ThreadPoolExecutor(
+        max_workers=max_concurrency, thread_name_prefix="agent-run"
+    ) as executor:
+        event_futures_per_model = [
+            [
+                executor.submit(
+                    _process_event_investment,
+                    model=model,
+                    event=event,
+                    target_date=target_date,
+                    full_question=event_prompts[event.id][0],
+                    market_data=event_prompts[event.id][1],
+                    backward_mode=backward_mode,
+                )
+                for event in events
+            ]
+            for model in models
+        ]
+        model_index_per_future = {
+            future: model_index
+            for model_index, event_futures in enumerate(event_futures_per_model)
+            for future in event_futures
+        }
+        n_pending_events = [len(events)] * len(models)
+        if not events:
+            for model_index in range(len(models)):
+                finish_model(model_index, [])
+        for future in as_completed(model_index_per_future):
+            model_index = model_index_per_future[future]
+            n_pending_events[model_index] -= 1
+            if n_pending_events[model_index] == 0:
+                finish_model(model_index, event_futures_per_model[model_index])
+
+    return [results[model_index] for model_index in sorted(results)]
+
+
 def run_agent_investments(
     models: list[ApiModel | str],
     events: list[Event],
@@ -337,30 +662,47 @@ def run_agent_investments(
     split: str,
     timestamp_for_saving: str,
     dataset_name: str | None = None,
+    max_concurrency: int = 4,
 ) -> list[ModelInvestmentDecisions]:
-    """Launch agent investments for events on a specific date."""
+    """Launch agent investments for events on a specific date.
+
+    Returns once the results are uploaded to the HF dataset, if dataset_name is set:
+    a failed upload is raised, so that scripts do not exit successfully without their data.
+    """
     logger.info(f"Running agent investments for {len(models)} models on {target_date}")
     logger.info(f"Processing {len(events)} events")
+    # Decided once for the whole run, so that it stays consistent if the run spans midnight
+    backward_mode = is_backward_mode(target_date)
 
-    results = []
-    for model in models:
-        model_name = model.model_id if isinstance(model, ApiModel) else model
-        logger.info(f"Processing model: {model_name}")
-        model_result = _process_single_model(
-            model=model,
-            events=events,
-            target_date=target_date,
-            date_output_path=date_output_path,
-            timestamp_for_saving=timestamp_for_saving,
+    event_prompts = {}
+    for event in events:
+        full_question, market_data = _build_event_prompt(
+            event=event, target_date=target_date, backward_mode=backward_mode
         )
-        results.append(model_result)
+        event_prompts[event.id] = (full_question, market_data)
 
-    if dataset_name:
-        _upload_results_to_hf_dataset(
-            results_per_model=results,
-            target_date=target_date,
-            dataset_name=dataset_name,
-            split=split,
-        )
+        # Save prompt to file if date_output_path is provided
+        if date_output_path:
+            prompt_file = (
+                date_output_path / f"prompt_event_{event.id}_{timestamp_for_saving}.txt"
+            )
+            write_to_storage(prompt_file, full_question)
+            logger.info(f"Saved prompt to {prompt_file}")
+
+    uploads = []
+    results = _process_all_models(
+        models=models,
+        events=events,
+        event_prompts=event_prompts,
+        target_date=target_date,
+        date_output_path=date_output_path,
+        timestamp_for_saving=timestamp_for_saving,
+        backward_mode=backward_mode,
+        max_concurrency=max_concurrency,
+        dataset_name=dataset_name,
+        split=split,
+        uploads=uploads,
+    )
+    wait_for_uploads(uploads)
 
     return results
@@ -1,16 +1,22 @@
-import json
+import re
 import textwrap
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
 from datetime import date
+from functools import cache, lru_cache, partial
+from typing import Literal
 
-import numpy as np
+import orjson
 import requests
+from openai import OpenAI
 from predibench.agent.dataclasses import (
     MarketInvestmentDecision,
     SingleModelDecision,
 )
 from predibench.logger_config import get_logger
 from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
 from smolagents import (
+    ActionStep,
     ApiModel,
     ChatMessage,
     LiteLLMModel,
@@ -28,6 +34,77 @@ from tenacity import (
 
 logger = get_logger(__name__)
 
+# Keep-alive session shared by all search tools, so that searches from every agent
+# reuse the same pooled TLS connections instead of opening a new one per request
+# NOTE: smolagents calls tools synchronously (parallel tool calls run in threads), so a
+# thread-safe sync pool is used rather than an async HTTP/2 client
+_SEARCH_SESSION = requests.Session()
+_SEARCH_SESSION.mount(
+    "https://", HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0)
+)
+
+
+def _format_search_result(idx: int, page: dict) -> str:
+    date_published = f"\nDate published: {page['date']}" if "date" in page else ""
+    source = f"\nSource: {page['source']}" if "source" in page else ""
+    snippet = f"\n{page['snippet']}" if "snippet" in page else ""
+    return (
+        f"{idx}. [{page['title']}]({page['link']}){date_published}{source}\n{snippet}"
+    )
+
+
+@lru_cache(maxsize=4096)
+def _web_search(provider: str, api_key: str, tbs: str | None, query: str) -> str:
+    """Perform a web search and render its results.
+
+    Cached in-process: agents often repeat the same queries, within a run or across
+    the agents working on the same event. Failed searches raise and are not cached.
+    """
+    if provider == "serpapi":
+        params = {
+            "q": query,
+            "api_key": api_key,
+            "engine": "google",
+            "google_domain": "google.com",
+        }
+        if tbs is not None:
+            params["tbs"] = tbs
+
+        response = _SEARCH_SESSION.get("https://serpapi.com/search.json", params=params)
+    else:
+        payload = {
+            "q": query,
+        }
+        if tbs is not None:
+            payload["tbs"] = tbs
+
+        headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
+        response = _SEARCH_SESSION.post(
+            "https://google.serper.dev/search", json=payload, headers=headers
+        )
+
+    if response.status_code == 200:
+        results = orjson.loads(response.content)
+    else:
+        logger.error(f"Error response: {response.status_code}")
+        logger.error(f"Response text: {response.text}")
+        raise ValueError(response.json())
+
+    organic_key = "organic_results" if provider == "serpapi" else "organic"
+    if organic_key not in results:
+        raise Exception(
+            f"No results found for query: '{query}'. Use a less restrictive query."
+        )
+    if len(results[organic_key]) == 0:
+        return f"No results found for '{query}'. Try with a more general query."
+
+    web_snippets = "\n\n".join(
+        _format_search_result(idx, page)
+        for idx, page in enumerate(results[organic_key])
+    )
+
+    return f"## Search Results for '{query}'\n" + web_snippets
+
 
 class GoogleSearchTool(Tool):
     name = "web_search"
@@ -40,9 +117,14 @@ class GoogleSearchTool(Tool):
     def __init__(self, provider: str, cutoff_date: date | None, api_key: str):
         super().__init__()
         self.provider = provider
-        self.organic_key = "organic_results" if provider == "serpapi" else "organic"
         self.api_key = api_key
         self.cutoff_date = cutoff_date
+        # Time-based search filter, fixed for the lifetime of the tool
+        self.tbs = (
+            f"cdr:1,cd_max:{cutoff_date.strftime('%m/%d/%Y')}"
+            if cutoff_date is not None
+            else None
+        )
 
     @retry(
         stop=stop_after_attempt(3),
@@ -51,62 +133,15 @@ class GoogleSearchTool(Tool):
         reraise=True,
     )
     def forward(self, query: str) -> str:
-        if self.provider == "serpapi":
-            params = {
-                "q": query,
-                "api_key": self.api_key,
-                "engine": "google",
-                "google_domain": "google.com",
-            }
-            if self.cutoff_date is not None:
-                params["tbs"] = f"cdr:1,cd_max:{self.cutoff_date.strftime('%m/%d/%Y')}"
-
-            response = requests.get("https://serpapi.com/search.json", params=params)
-        else:
-            payload = {
-                "q": query,
-            }
-            if self.cutoff_date is not None:
-                payload["tbs"] = f"cdr:1,cd_max:{self.cutoff_date.strftime('%m/%d/%Y')}"
-
-            headers = {"X-API-KEY": self.api_key, "Content-Type": "application/json"}
-            response = requests.post(
-                "https://google.serper.dev/search", json=payload, headers=headers
-            )
-
-        if response.status_code == 200:
-            results = response.json()
-        else:
-            logger.error(f"Error response: {response.status_code}")
-            logger.error(f"Response text: {response.text}")
-            raise ValueError(response.json())
-
-        if self.organic_key not in results.keys():
-            raise Exception(
-                f"No results found for query: '{query}'. Use a less restrictive query."
-            )
-        if len(results[self.organic_key]) == 0:
-            return f"No results found for '{query}'. Try with a more general query."
-
-        web_snippets = []
-        if self.organic_key in results:
-            for idx, page in enumerate(results[self.organic_key]):
-                date_published = ""
-                if "date" in page:
-                    date_published = "\nDate published: " + page["date"]
-
-                source = ""
-                if "source" in page:
-                    source = "\nSource: " + page["source"]
-
-                snippet = ""
-                if "snippet" in page:
-                    snippet = "\n" + page["snippet"]
+        return _web_search(
+            provider=self.provider,
+            api_key=self.api_key,
+            tbs=self.tbs,
+            query=query,
+        )
 
-                redacted_version = f"{idx}. [{page['title']}]({page['link']}){date_published}{source}\n{snippet}"
-                web_snippets.append(redacted_version)
 
-        return f"## Search Results for '{query}'\n" + "\n\n".join(web_snippets)
+_REQUIRED_DECISION_KEYS = frozenset({"market_id", "rationale", "odds", "bet"})
 
 
 @tool
@@ -130,14 +165,9 @@ def final_answer(
     assert unallocated_capital >= 0.0, "Unallocated capital cannot be negative"
 
     for decision_dict in market_decisions:
-        assert "rationale" in decision_dict, (
-            "A key 'rationale' is required for each market decision"
-        )
-        assert "odds" in decision_dict, (
-            "A key 'odds' is required for each market decision"
-        )
-        assert "bet" in decision_dict, (
-            "A key 'bet' is required for each market decision"
+        missing_keys = _REQUIRED_DECISION_KEYS - decision_dict.keys()
+        assert not missing_keys, (
+            f"Keys {sorted(missing_keys)} are required for each market decision"
         )
         assert -1.0 <= decision_dict["bet"] <= 1.0, (
             f"Your bet must be between -1.0 and 1.0, got {decision_dict['bet']} for market {decision_dict['market_id']}"
@@ -151,7 +181,7 @@ def final_answer(
             odds=decision_dict["odds"],
             bet=decision_dict["bet"],
         )
-        total_allocated += np.abs(decision_dict["bet"])
+        total_allocated += abs(decision_dict["bet"])
 
         market_decision = MarketInvestmentDecision(
             market_id=decision_dict["market_id"],
@@ -175,22 +205,75 @@ class ListMarketInvestmentDecisions(BaseModel):
     market_investment_decisions: list[MarketInvestmentDecision]
 
 
-def run_smolagents(
+# Built once: schema generation is pure but not free
+_DECISIONS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "response",
+        "schema": ListMarketInvestmentDecisions.model_json_schema(),
+    },
+}
+
+
+# Kept static and sent ahead of the research output, so that it forms a cacheable prompt prefix
+_EXTRACTION_INSTRUCTIONS = textwrap.dedent("""
+    Based on the research output provided by the user, extract the investment decisions for each market.
+
+    You must provide a list of market decisions. Each decision should include:
+    1. market_id: The ID of the market
+    2. reasoning: Your reasoning for this decision
+    3. probability_assessment: Your probability assessment (0.0 to 1.0)
+    4. confidence_in_assessment: Your confidence level (0.0 to 1.0)
+    5. direction: "buy_yes", "buy_no", or "nothing"
+    6. amount: Fraction of capital to bet (0.0 to 1.0)
+
+    The sum of all amounts must not exceed 1.0.
+""")
+
+
+# Observations of older steps can be truncated, so that the context resent at each step grows slowly
+_VERBATIM_OBSERVATION_STEPS = 2
+# Start of an entry of an observation: a numbered search result or a section heading
+_OBSERVATION_ENTRY_START = re.compile(r"^(?:\d+\. \[|## )", re.MULTILINE)
+
+
+def _truncate_observation(observation: str, max_chars: int) -> str:
+    """Keep the leading whole entries of an observation that fit in max_chars, drop the others."""
+    if len(observation) <= max_chars:
+        return observation
+    entry_starts = [
+        match.start() for match in _OBSERVATION_ENTRY_START.finditer(observation)
+    ]
+    # Everything before an entry start is made of whole entries
+    cut = max((start for start in entry_starts if start <= max_chars), default=0)
+    n_dropped_entries = sum(start >= cut for start in entry_starts)
+    if n_dropped_entries == 0:
+        # Already truncated, or no entry to cut at
+        return observation
+    return (
+        observation[:cut].rstrip("\n")
+        + f"\n[... {n_dropped_entries} more entries truncated]"
+    )
+
+
+def _truncate_old_observations(
+    memory_step: ActionStep, agent: ToolCallingAgent, max_chars: int
+) -> None:
+    action_steps = [step for step in agent.memory.steps if isinstance(step, ActionStep)]
+    for step in action_steps[:-_VERBATIM_OBSERVATION_STEPS]:
+        if step.observations:
+            step.observations = _truncate_observation(step.observations, max_chars)
+
+
+def _build_agent(
     model: ApiModel,
-    question: str,
     cutoff_date: date | None,
     search_provider: str,
     search_api_key: str,
     max_steps: int,
-) -> list[MarketInvestmentDecision]:
-    """Run smolagent for event-level analysis with structured output."""
-
-    prompt = f"""{question}
-        
-Use the final_answer tool to validate your output before providing the final answer.
-The final_answer tool must contain the arguments rationale and decision.
-"""
-
+    max_tool_threads: int,
+    max_old_observation_chars: int | None,
+) -> ToolCallingAgent:
     tools = [
         GoogleSearchTool(
             provider=search_provider, cutoff_date=cutoff_date, api_key=search_api_key
@@ -198,25 +281,148 @@ The final_answer tool must contain the arguments rationale and decision.
         VisitWebpageTool(),
         final_answer,
     ]
-    agent = ToolCallingAgent(
-        tools=tools, model=model, max_steps=max_steps, return_full_result=True
+    return ToolCallingAgent(
+        tools=tools,
+        model=model,
+        max_steps=max_steps,
+        return_full_result=True,
+        max_tool_threads=max_tool_threads,
+        step_callbacks=[
+            partial(_truncate_old_observations, max_chars=max_old_observation_chars)
+        ]
+        if max_old_observation_chars is not None
+        else [],
     )
 
-    result = agent.run(prompt)
+
+def _build_agent_prompt(question: str) -> str:
+    return f"""{question}
+        
+Use the final_answer tool to validate your output before providing the final answer.
+The final_answer tool must contain the arguments rationale and decision.
+"""
+
+
+def run_smolagents(
+    model: ApiModel,
+    question: str,
+    cutoff_date: date | None,
+    search_provider: str,
+    search_api_key: str,
+    max_steps: int,
+    max_tool_threads: int = 8,
+    max_old_observation_chars: int | None = None,
+) -> list[MarketInvestmentDecision]:
+    """Run smolagent for event-level analysis with structured output.
+
+    When the model emits several tool calls in one step (e.g. multiple searches),
+    they are executed in parallel on up to max_tool_threads threads.
+    With max_old_observation_chars, the tool results of steps older than the last two are cut
+    to their leading whole entries (e.g. search results) within that many characters.
+    """
+    agent = _build_agent(
+        model=model,
+        cutoff_date=cutoff_date,
+        search_provider=search_provider,
+        search_api_key=search_api_key,
+        max_steps=max_steps,
+        max_tool_threads=max_tool_threads,
+        max_old_observation_chars=max_old_observation_chars,
+    )
+
+    result = agent.run(_build_agent_prompt(question))
 
     return result.output
 
 
+def _is_successful_run(future: Future) -> bool:
+    # Agents that hit max_steps without calling final_answer return a plain text output
+    return future.exception() is None and isinstance(future.result().output, list)
+
+
+def run_smolagents_batch(
+    model: ApiModel,
+    question: str,
+    cutoff_date: date | None,
+    search_provider: str,
+    search_api_key: str,
+    max_steps: int,
+    n_jobs: int = 3,
+    strategy: Literal["first_success", "all_finished"] = "first_success",
+    max_tool_threads: int = 8,
+    max_old_observation_chars: int | None = None,
+) -> list[MarketInvestmentDecision]:
+    """Run n_jobs agents concurrently on the same question and return one successful output.
+
+    With strategy="first_success", the first agent to return decisions wins and the others are
+    interrupted at their next step. With "all_finished", all agents run to completion and the
+    output of the first successful one, in launch order, is returned.
+    """
+    if strategy not in ("first_success", "all_finished"):
+        raise ValueError(f"Unknown strategy: {strategy}")
+
+    prompt = _build_agent_prompt(question)
+    agents = [
+        _build_agent(
+            model=model,
+            cutoff_date=cutoff_date,
+            search_provider=search_provider,
+            search_api_key=search_api_key,
+            max_steps=max_steps,
+            max_tool_threads=max_tool_threads,
+            max_old_observation_chars=max_old_observation_chars,
+        )
+        for _ in range(n_jobs)
+    ]
+
+    # Not used as a context manager: its exit would wait for the interrupted agents to finish
+    # their current step (LLM call and tool calls) before returning the winning output
+    executor = ThreadPoolExecutor(max_workers=n_jobs)
+    try:
+        futures = [executor.submit(agent.run, prompt) for agent in agents]
+        if strategy == "first_success":
+            finished = as_completed(futures)
+        else:
+            wait(futures)
+            finished = futures
+
+        for future in finished:
+            if _is_successful_run(future):
+                for agent in agents:
+                    agent.interrupt()
+                return future.result().output
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    errors = [future.exception() for future in futures if future.exception()]
+    raise RuntimeError(f"None of the {n_jobs} agent runs returned decisions") from (
+        errors[-1] if errors else None
+    )
+
+
+# Clients are shared across calls, so that concurrent event runs reuse their connection pools
+@cache
+def _get_openai_client() -> OpenAI:
+    return OpenAI(timeout=3600)
+
+
+@cache
+def _get_structured_output_model(model_id: str) -> LiteLLMModel:
+    return LiteLLMModel(model_id=model_id)
+
+
 def run_deep_research(
     model_id: str,
     question: str,
     structured_output_model_id: str,
+    structured_output_service_tier: str | None = "flex",
 ) -> list[MarketInvestmentDecision]:
-    from openai import OpenAI
-
-    client = OpenAI(timeout=3600)
+    """Run a deep research model, then extract its decisions with a structured output model.
 
-    response = client.responses.create(
+    The extraction step is not latency-critical (the research step takes much longer), so it
+    uses OpenAI's "flex" service tier by default, billed at Batch API rates.
+    """
+    response = _get_openai_client().responses.create(
         model=model_id,
         input=question
         + "\n\nProvide your detailed analysis and reasoning, then clearly state your final decisions for each market you want to bet on.",
@@ -228,36 +434,20 @@ def run_deep_research(
     research_output = response.output_text
 
     # Use structured output to get EventDecisions
-    structured_model = LiteLLMModel(
-        model_id=structured_output_model_id,
-    )
-
-    structured_prompt = textwrap.dedent(f"""
-        Based on the following research output, extract the investment decisions for each market:
-        
-        {research_output}
-        
-        You must provide a list of market decisions. Each decision should include:
-        1. market_id: The ID of the market
-        2. reasoning: Your reasoning for this decision
-        3. probability_assessment: Your probability assessment (0.0 to 1.0)
-        4. confidence_in_assessment: Your confidence level (0.0 to 1.0)
-        5. direction: "buy_yes", "buy_no", or "nothing"
-        6. amount: Fraction of capital to bet (0.0 to 1.0)
-        
-        The sum of all amounts must not exceed 1.0.
-    """)
+    structured_model = _get_structured_output_model(structured_output_model_id)
 
+    generate_kwargs = {}
+    if structured_output_service_tier is not None:
+        generate_kwargs["service_tier"] = structured_output_service_tier
     structured_output = structured_model.generate(
-        [ChatMessage(role="user", content=structured_prompt)],
-        response_format={
-            "type": "json_schema",
-            "json_schema": {
-                "name": "response",
-                "schema": ListMarketInvestmentDecisions.model_json_schema(),
-            },
-        },
+        [
+            ChatMessage(role="system", content=_EXTRACTION_INSTRUCTIONS),
+            ChatMessage(role="user", content=research_output),
+        ],
+        response_format=_DECISIONS_RESPONSE_FORMAT,
+        **generate_kwargs,
     )
 
-    parsed_output = json.loads(structured_output.content)
-    return parsed_output["market_investment_decisions"]
+    return ListMarketInvestmentDecisions.model_validate_json(
+        structured_output.content
+    ).market_investment_decisions
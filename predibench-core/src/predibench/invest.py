@@ -1,4 +1,6 @@
+import hashlib
 import os
+import threading
 from datetime import date, timedelta
 from pathlib import Path
 
@@ -12,19 +14,32 @@ from predibench.agent.runner import ModelInvestmentDecisions, run_agent_investme
 from predibench.common import DATA_PATH
 from predibench.logger_config import get_logger
 from predibench.market_selection import choose_events
-from predibench.polymarket_data import load_events_from_file
+from predibench.polymarket_data import load_events_from_file, save_events_to_file
 from predibench.retry_models import (
     InferenceClientModelWithRetry,
     OpenAIModelWithRetry,
 )
+from predibench.storage_utils import ensure_directory
 from predibench.utils import get_timestamp_string
 
 load_dotenv()
-login(os.getenv("HF_TOKEN"))
+# Without a token there is nothing to log in with, skip the call to the Hub
+if os.getenv("HF_TOKEN"):
+    login(os.getenv("HF_TOKEN"))
 
 logger = get_logger(__name__)
 
 
+def _load_model(model: ApiModel | str) -> ApiModel | str:
+    """Instantiate models given as "openai/<model_id>" or "huggingface/<model_id>"."""
+    if isinstance(model, str):
+        if model.startswith("openai/"):
+            return OpenAIModelWithRetry(model_id=model[len("openai/") :])
+        elif model.startswith("huggingface/"):
+            return InferenceClientModelWithRetry(model_id=model[len("huggingface/") :])
+    return model
+
+
 def run_investments_for_specific_date(
     models: list[ApiModel | str],
     max_n_events: int,
@@ -33,22 +48,49 @@ def run_investments_for_specific_date(
     target_date: date,
     cache_file_path: Path | None = None,
     load_from_cache: bool = False,
+    reuse_final_cache: bool = False,
     filter_crypto_events: bool = True,
     dataset_name: str = "Sibyllic/predibench",
     split: str = "train",
+    max_concurrency: int = 4,
 ) -> list[ModelInvestmentDecisions]:
-    """Run event-based investment simulation with multiple AI models."""
-    logger.info(f"Running investment analysis for {target_date}")
-
-    date_output_path = output_path / target_date.strftime("%Y-%m-%d")
-    date_output_path.mkdir(parents=True, exist_ok=True)
-
+    """Run event-based investment simulation with multiple AI models.
+
+    Up to max_concurrency (model, event) agent runs are executed at the same time.
+
+    With reuse_final_cache, an events cache written after the end of the selection window
+    is reused even without load_from_cache, since its events and prices can no longer change.
+    """
+    target_date_str = target_date.isoformat()  # YYYY-MM-DD
+    logger.info(f"Running investment analysis for {target_date_str}")
+
+    date_output_path = ensure_directory(output_path / target_date_str)
+
+    # Named after the selection parameters, so that reruns with the same parameters find it
+    selection_key = hashlib.sha1(
+        repr(
+            (
+                target_date_str,
+                int(time_until_ending.total_seconds()),
+                max_n_events,
+                filter_crypto_events,
+            )
+        ).encode()
+    ).hexdigest()[:16]
     cache_file_path = (
-        cache_file_path
-        or date_output_path / f"events_cache_{get_timestamp_string()}.json"
+        cache_file_path or date_output_path / f"events_cache_{selection_key}.json"
     )
 
-    if cache_file_path.exists() and load_from_cache:
+    # A cache written during the selection window may hold prices that changed since
+    cache_is_final = (
+        reuse_final_cache
+        and cache_file_path.exists()
+        and date.fromtimestamp(cache_file_path.stat().st_mtime)
+        > target_date + time_until_ending
+    )
+
+    cache_writer = None
+    if cache_file_path.exists() and (load_from_cache or cache_is_final):
         logger.info("Loading events from cache")
         selected_events = load_events_from_file(cache_file_path)
     else:
@@ -58,23 +100,20 @@ def run_investments_for_specific_date(
             time_until_ending=time_until_ending,
             n_events=max_n_events,
             filter_crypto_events=filter_crypto_events,
-            save_path=cache_file_path,
         )
+        # Write the cache in the background, agents don't need it
+        cache_writer = threading.Thread(
+            target=save_events_to_file,
+            kwargs={"events": selected_events, "file_path": cache_file_path},
+        )
+        cache_writer.start()
 
     logger.info(f"Selected {len(selected_events)} events:")
     for event in selected_events:
-        logger.info(f"  - {event.title} (Volume: ${event.volume:,.0f})")
-
-    for model in models:
-        if isinstance(model, str):
-            if model.startswith("openai/"):
-                models[models.index(model)] = OpenAIModelWithRetry(
-                    model_id=model[len("openai/") :]
-                )
-            elif model.startswith("huggingface/"):
-                models[models.index(model)] = InferenceClientModelWithRetry(
-                    model_id=model[len("huggingface/") :]
-                )
+        volume = f"${event.volume:,.0f}" if event.volume is not None else "unknown"
+        logger.info(f"  - {event.title} (Volume: {volume})")
+
+    models = [_load_model(model) for model in models]
 
     results = run_agent_investments(
         models=models,
@@ -84,8 +123,12 @@ def run_investments_for_specific_date(
         dataset_name=dataset_name,
         split=split,
         timestamp_for_saving=get_timestamp_string(),
+        max_concurrency=max_concurrency,
     )
 
+    if cache_writer is not None:
+        cache_writer.join()
+
     logger.info("Investment analysis complete!")
 
     return results
@@ -1,67 +1,61 @@
+import re
 from datetime import date, datetime, timedelta
+from itertools import compress, islice
 from pathlib import Path
 
+import numpy as np
+
 from predibench.date_utils import is_backward_mode
 from predibench.logger_config import get_logger
 from predibench.polymarket_api import (
     Event,
     EventsRequestParameters,
+    fill_prices_of_markets,
 )
 from predibench.polymarket_data import save_events_to_file
 
 logger = get_logger(__name__)
 
+_CRYPTO_TAG_ID = 21  # Polymarket's "Crypto" tag
+# One pass over the slug for all keywords
+_CRYPTO_SLUG_PATTERN = re.compile(r"bitcoin|ethereum|xrp|solana|eth|btc", re.IGNORECASE)
+
 
-def _remove_markets_without_prices_in_events(events: list[Event]) -> list[Event]:
-    """Remove markets that have no prices"""
+def _remove_markets_without_prices_in_events(
+    events: list[Event], has_prices: list[bool]
+) -> list[Event]:
+    """Remove markets that have no prices, given the flags returned by fill_prices_of_markets for the markets of all events"""
+    has_prices_iterator = iter(has_prices)
     filtered_events = []
     for event in events:
-        market_filtered = [
-            market
-            for market in event.markets
-            if market.prices is not None and len(market.prices) >= 1
-        ]
+        market_filtered = list(
+            compress(event.markets, islice(has_prices_iterator, len(event.markets)))
+        )
         event.markets = market_filtered
         if len(market_filtered) > 0:
             filtered_events.append(event)
     return filtered_events
 
 
-def _filter_crypto_events(events: list[Event]) -> list[Event]:
-    """Filter out events related to crypto by checking if 'bitcoin' or 'ethereum' is in the slug."""
-    crypto_keywords = ["bitcoin", "ethereum", "xrp", "solana", "eth", "btc"]
-    filtered_events = []
+def _is_crypto_event(event: Event) -> bool:
+    """Check if an event is related to crypto, from keywords like 'bitcoin' or 'eth' in its slug."""
+    is_crypto = _CRYPTO_SLUG_PATTERN.search(event.slug or "") is not None
+    if is_crypto:
+        logger.info(f"Filtered out crypto event: {event.title} (slug: {event.slug})")
+    return is_crypto
 
-    for event in events:
-        slug_lower = event.slug.lower() if event.slug else ""
-        is_crypto = any(keyword in slug_lower for keyword in crypto_keywords)
 
-        if not is_crypto:
-            filtered_events.append(event)
-        else:
-            logger.info(
-                f"Filtered out crypto event: {event.title} (slug: {event.slug})"
-            )
-
-    return filtered_events
-
-
-def _filter_events_by_volume_and_markets(
-    events: list[Event], min_volume: float = 1000, backward_mode: bool = False
-) -> list[Event]:
-    """Filter events based on volume threshold and presence of markets."""
-    filtered_events = []
-    for event in events:
-        if event.markets and len(event.markets) > 0:
-            if backward_mode:
-                # In backward mode, we can't rely on volume24hr as it may not be available for historical events
-                # Just ensure events have markets
-                filtered_events.append(event)
-            elif (
-                event.volume24hr and event.volume24hr > min_volume
-            ):  # Minimum volume threshold
-                filtered_events.append(event)
-    return filtered_events
+def _has_markets_and_volume(
+    event: Event, min_volume: float = 1000, backward_mode: bool = False
+) -> bool:
+    """Check the presence of markets and the volume threshold of an event."""
+    if not event.markets:
+        return False
+    if backward_mode:
+        # In backward mode, we can't rely on volume24hr as it may not be available for historical events
+        # Just ensure events have markets
+        return True
+    return bool(event.volume24hr and event.volume24hr > min_volume)
 
 
 def _select_markets_for_events(
@@ -70,39 +64,41 @@ def _select_markets_for_events(
     """Keep all relevant markets for each event instead of selecting just one."""
 
     if backward_mode:
+        # Flatten the end dates of all markets into one array, to check them in a single pass
+        market_end_dates = np.array(
+            [
+                market.end_datetime.date() if market.end_datetime else date.max
+                for event in events
+                for market in event.markets
+            ],
+            dtype="datetime64[D]",
+        )
+        is_market_open = market_end_dates > np.datetime64(base_date)
+        split_indices = np.cumsum([len(event.markets) for event in events])[:-1]
+
         events_with_markets = []
-        for event in events:
+        for event, event_markets_open in zip(
+            events, np.split(is_market_open, split_indices)
+        ):
+            event_end_date = event.end_datetime.date() if event.end_datetime else None
             # Filter events where end_date is after base_date, or keep if end_date doesn't exist
-            if event.end_datetime is None or event.end_datetime.date() > base_date:
+            if event_end_date is None or event_end_date > base_date:
                 # Filter markets that are still active
-                eligible_markets = [
-                    market
-                    for market in event.markets
-                    if market.end_datetime is None
-                    or market.end_datetime.date() > base_date
-                ]
+                eligible_markets = list(compress(event.markets, event_markets_open))
 
                 if eligible_markets:
                     event.markets = eligible_markets  # Keep all eligible markets
                     events_with_markets.append(event)
 
-                    end_date_str = (
-                        event.end_datetime.date()
-                        if event.end_datetime
-                        else "no end date"
-                    )
                     logger.info(
-                        f"Backward mode: Selected event '{event.title}' ending {end_date_str} with {len(eligible_markets)} markets"
+                        f"Backward mode: Selected event '{event.title}' ending {event_end_date or 'no end date'} with {len(eligible_markets)} markets"
                     )
 
         return events_with_markets
 
     events_with_markets = []
     for event in events:
-        eligible_markets = []
-        for market in event.markets:
-            if market.outcomes and len(market.outcomes) > 0:
-                eligible_markets.append(market)
+        eligible_markets = [market for market in event.markets if market.outcomes]
 
         if eligible_markets:
             event.markets = eligible_markets  # Keep all eligible markets
@@ -138,32 +134,45 @@ def choose_events(
         ascending=False,
         end_date_min=start_datetime if backward_mode else None,
         end_date_max=end_datetime,
+        # Excluded server-side so that the limit is not spent on events dropped below
+        exclude_tag_id=_CRYPTO_TAG_ID if filter_crypto_events else None,
     )
-    events = request_parameters.get_events()
-
-    if filter_crypto_events:
-        events = _filter_crypto_events(events)
-
-    filtered_events = _filter_events_by_volume_and_markets(
-        events=events, min_volume=min_volume, backward_mode=backward_mode
+    # Single lazy pass over the events, that stops once enough candidates are found:
+    # pages of events are only requested as the filters consume them
+    candidate_events = (
+        event
+        for event in request_parameters.iter_events(page_size=100)
+        # Crypto filter still needed for crypto events that are missing the tag
+        if not (filter_crypto_events and _is_crypto_event(event))
+        and _has_markets_and_volume(
+            event, min_volume=min_volume, backward_mode=backward_mode
+        )
     )
-    filtered_events = filtered_events[
-        : n_events + int(n_events * 0.2 + 3)
-    ]  # NOTE: a few events might be missing prices and will be removed later so we add a few more events to be sure to have enough
-
-    for event in filtered_events:
-        for market in event.markets:
-            if backward_mode:
-                market.fill_prices(end_datetime=end_datetime)
-            else:
-                market.fill_prices()
+    # Prices are only fetched for as many events as still missing: events left without
+    # eligible markets are replaced by the next candidates in a new round
+    events_with_selected_markets: list[Event] = []
+    while len(events_with_selected_markets) < n_events:
+        events_batch = list(
+            islice(candidate_events, n_events - len(events_with_selected_markets))
+        )
+        if not events_batch:
+            break
+        if events_with_selected_markets:
+            logger.info(
+                f"Fetching {len(events_batch)} more events to replace events without eligible markets"
+            )
 
-    filtered_events = _remove_markets_without_prices_in_events(filtered_events)
+        has_prices = fill_prices_of_markets(
+            markets=[market for event in events_batch for market in event.markets],
+            end_datetime=end_datetime if backward_mode else None,
+        )
+        events_batch = _remove_markets_without_prices_in_events(
+            events_batch, has_prices
+        )
+        events_with_selected_markets += _select_markets_for_events(
+            events=events_batch, base_date=target_date, backward_mode=backward_mode
+        )
 
-    events_with_selected_markets = _select_markets_for_events(
-        events=filtered_events, base_date=target_date, backward_mode=backward_mode
-    )
-    events_with_selected_markets = events_with_selected_markets[:n_events]
     if save_path is not None:
         save_events_to_file(events=events_with_selected_markets, file_path=save_path)
 
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-import json
 import logging
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta, timezone
+from itertools import count
 
+import orjson
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 
 # TODO: respect rate limits:
 # **API Rate Limits**
@@ -26,6 +30,7 @@ from tenacity import (
     retry_if_exception_type,
     stop_after_attempt,
     wait_exponential,
+    wait_random,
 )
 
 from predibench.common import BASE_URL_POLYMARKET
@@ -40,7 +45,8 @@ logger = get_logger(__name__)
 # Common retry configuration for all API calls
 polymarket_retry = retry(
     stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=10, max=60),
+    # Random jitter so that price fetch threads throttled together do not all retry at once
+    wait=wait_exponential(multiplier=1, min=10, max=60) + wait_random(0, 5),
     retry=retry_if_exception_type(
         (
             requests.exceptions.RequestException,
@@ -54,6 +60,37 @@ polymarket_retry = retry(
 )
 
 
+# Keep-alive session shared by all Polymarket requests, so that successive calls (e.g. over
+# the dates of a backfill) reuse pooled TLS connections. Sized for the price fetch threads.
+_POLYMARKET_SESSION = requests.Session()
+_POLYMARKET_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# Shared by all price fetches, so that threads are created once per process
+_PRICES_EXECUTOR = ThreadPoolExecutor(
+    max_workers=16, thread_name_prefix="polymarket-prices"
+)
+
+
+def _fill_prices_and_check(market: Market, end_datetime: datetime | None) -> bool:
+    market.fill_prices(end_datetime=end_datetime)
+    return market.prices is not None and len(market.prices) >= 1
+
+
+def fill_prices_of_markets(
+    markets: list[Market], end_datetime: datetime | None = None
+) -> list[bool]:
+    """Fill the prices of all markets, with concurrent requests to the timeseries API.
+
+    Returns whether each market got at least one price, in the order of the markets.
+    """
+    # Consuming the results also re-raises errors from the worker threads
+    return list(
+        _PRICES_EXECUTOR.map(
+            lambda market: _fill_prices_and_check(market, end_datetime), markets
+        )
+    )
+
+
 class MarketOutcome(BaseModel):
     clob_token_id: str
     name: str
@@ -77,6 +114,12 @@ class Market(BaseModel, arbitrary_types_allowed=True):
     prices: pd.Series | None = None
     price_outcome_name: str | None = None  # Name of the outcome the prices represent
 
+    @property
+    def display_outcome_name(self) -> str:
+        """Name of the outcome the prices represent, for display in prompts."""
+        # NOTE: not cached since fill_prices can update price_outcome_name
+        return self.price_outcome_name or "Unknown outcome"
+
     def fill_prices(self, end_datetime: datetime | None = None) -> None:
         """Fill the prices field with timeseries data.
 
@@ -109,22 +152,22 @@ class Market(BaseModel, arbitrary_types_allowed=True):
         """Convert a market JSON object to a PolymarketMarket dataclass."""
 
         assert "outcomes" in market_data
-        outcomes = json.loads(market_data["outcomes"])
+        outcomes = orjson.loads(market_data["outcomes"])
         assert len(outcomes) >= 2, (
             f"Expected at least 2 outcomes, got {len(outcomes)} for market:\n{market_data['id']}\n{market_data['question']}"
         )
-        outcome_names = json.loads(market_data["outcomes"])
+        outcome_names = outcomes
 
         # Handle missing price data
         if "outcomePrices" in market_data:
-            outcome_prices = json.loads(market_data["outcomePrices"])
+            outcome_prices = orjson.loads(market_data["outcomePrices"])
         else:
             # Default to 0.5 for all outcomes if prices not available
             outcome_prices = [0.5] * len(outcomes)
 
         # Handle missing token IDs
         if "clobTokenIds" in market_data:
-            outcome_clob_token_ids = json.loads(market_data["clobTokenIds"])
+            outcome_clob_token_ids = orjson.loads(market_data["clobTokenIds"])
         else:
             # Use empty strings if token IDs not available
             outcome_clob_token_ids = [""] * len(outcomes)
@@ -174,7 +217,8 @@ class _RequestParameters(BaseModel):
     offset: int | None = None
     order: str | None = None
     ascending: bool | None = None
-    id: int | None = None
+    # NOTE: a list is sent as repeated id parameters, to fetch several items in one request
+    id: int | list[int] | None = None
     slug: str | None = None
     archived: bool | None = None
     active: bool | None = None
@@ -192,6 +236,7 @@ class _RequestParameters(BaseModel):
     )
     end_date_max: date | None = None
     tag_id: int | None = None
+    exclude_tag_id: int | None = None
     related_tags: bool | None = None
 
 
@@ -221,9 +266,9 @@ class MarketsRequestParameters(_RequestParameters):
                 else:
                     params[field_name] = value
 
-        response = requests.get(url, params=params)
+        response = _POLYMARKET_SESSION.get(url, params=params)
         response.raise_for_status()
-        output = response.json()
+        output = orjson.loads(response.content)
         markets = [Market.from_json(market) for market in output]
         if self.end_date_min and self.end_date_max:
             filtered_markets = []
@@ -246,8 +291,7 @@ class MarketsRequestParameters(_RequestParameters):
             markets = filtered_markets
 
         if end_datetime:
-            for market in markets:
-                market.fill_prices(end_datetime)
+            fill_prices_of_markets(markets, end_datetime=end_datetime)
         return markets
 
 
@@ -273,9 +317,9 @@ class _HistoricalTimeSeriesRequestParameters(BaseModel):
             },
         ]
         for params in set_of_params:
-            response = requests.get(url, params=params)
+            response = _POLYMARKET_SESSION.get(url, params=params)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             if len(data["history"]) > 0:
                 break
 
@@ -323,9 +367,9 @@ class EventsRequestParameters(_RequestParameters):
                 else:
                     params[field_name] = value
 
-        response = requests.get(url, params=params)
+        response = _POLYMARKET_SESSION.get(url, params=params)
         response.raise_for_status()
-        output = response.json()
+        output = orjson.loads(response.content)
 
         events = []
         for event_data in output:
@@ -334,6 +378,29 @@ class EventsRequestParameters(_RequestParameters):
 
         return events
 
+    def iter_events(self, page_size: int = 100) -> Iterator[Event]:
+        """Yield events page by page, so that a consumer stopping early does not fetch the next pages.
+
+        The limit of this request, if set, caps the total number of events yielded.
+        """
+        # NOTE: the ordering can shift between two page requests, so an event can come back on the next page
+        seen_event_ids = set()
+        start = self.offset or 0
+        end = start + self.limit if self.limit else None
+        for page_offset in count(start, page_size):
+            page_limit = page_size if end is None else min(page_size, end - page_offset)
+            if page_limit <= 0:
+                return
+            page = self.model_copy(
+                update={"offset": page_offset, "limit": page_limit}
+            ).get_events()
+            for event in page:
+                if event.id not in seen_event_ids:
+                    seen_event_ids.add(event.id)
+                    yield event
+            if len(page) < page_limit:
+                return
+
 
 class Event(BaseModel, arbitrary_types_allowed=True):
     id: str
@@ -431,7 +498,7 @@ class OrderBook(BaseModel):
         url = "https://clob.polymarket.com/book"
         params = {"token_id": token_id}
 
-        response = requests.get(url, params=params)
+        response = _POLYMARKET_SESSION.get(url, params=params)
         response.raise_for_status()
         data = response.json()
 
@@ -1,8 +1,8 @@
-import json
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+import orjson
 import pandas as pd
 
 from predibench.logger_config import get_logger
@@ -75,7 +75,8 @@ def market_from_dict(market_data: dict[str, Any]) -> Market:
 
 def event_to_dict(event: Event) -> dict[str, Any]:
     """Convert an Event object to a dictionary for JSON serialization."""
-    event_dict = event.model_dump()
+    # Markets are dumped by market_to_dict below, not twice
+    event_dict = event.model_dump(exclude={"markets"})
 
     # Handle datetime serialization
     if event_dict.get("start_datetime"):
@@ -115,10 +116,11 @@ def event_from_dict(event_data: dict[str, Any]) -> Event:
 def save_events_to_file(events: list[Event], file_path: Path) -> None:
     """Save a list of Event objects to a JSON file."""
 
-    # Use the event_to_dict function for each event
-    events_data = [event_to_dict(event) for event in events]
-
-    content = json.dumps(events_data, indent=2)
+    # Serialized one event at a time, so that the dicts of all events are never held at once.
+    # Compact orjson output: the cache can hold thousands of price points per market
+    content = (
+        b"[" + b",".join(orjson.dumps(event_to_dict(event)) for event in events) + b"]"
+    )
     write_to_storage(file_path, content)
 
     logger.info(f"Saved {len(events)} events to cache: {file_path}")
@@ -128,7 +130,7 @@ def load_events_from_file(file_path: Path) -> list[Event]:
     """Load a list of Event objects from a JSON file."""
 
     content = read_from_storage(file_path)
-    events_data = json.loads(content)
+    events_data = orjson.loads(content)
 
     # Use the event_from_dict function for each event
     events = [event_from_dict(event_data) for event_data in events_data]
@@ -21,26 +21,31 @@ logger = get_logger(__name__)
 
 BUCKET_ENV_VAR = "BUCKET_PREDIBENCH"
 
-try:
-    STORAGE_CLIENT = storage.Client()
-except Exception as e:
-    logger.error(f"Error initializing storage client: {e}")
-    STORAGE_CLIENT = None
-
 
 @cache
-def get_bucket() -> storage.Bucket | None:
-    if STORAGE_CLIENT is None:
+def get_storage_client() -> storage.Client | None:
+    """Create the storage client on first use, since resolving credentials can take seconds."""
+    try:
+        return storage.Client()
+    except Exception as e:
+        logger.error(f"Error initializing storage client: {e}")
         return None
 
+
+@cache
+def get_bucket() -> storage.Bucket | None:
     if BUCKET_ENV_VAR not in os.environ:
         print(
             f"To enable bucket access please set the {BUCKET_ENV_VAR} environment variable, defaulting to data directory."
         )
         return None
 
+    storage_client = get_storage_client()
+    if storage_client is None:
+        return None
+
     bucket_name = os.getenv(BUCKET_ENV_VAR)
-    return STORAGE_CLIENT.bucket(bucket_name)
+    return storage_client.bucket(bucket_name)
 
 
 @cache
@@ -81,13 +86,20 @@ def has_bucket_access(write_access_only: bool = True) -> bool:
         return False
 
 
+@cache
+def ensure_directory(path: Path) -> Path:
+    """Create a directory and its parents if needed, once per process for a given path."""
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
 def _write_file_to_bucket_or_data_dir(file_path: Path, blob_name: str) -> bool:
     """
     Upload a local file to bucket if available, and also save locally for debugging.
     """
     # Always save locally for debugging
     local_dest = DATA_PATH / blob_name
-    local_dest.parent.mkdir(parents=True, exist_ok=True)
+    ensure_directory(local_dest.parent)
     if file_path.suffix.lower() in [".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg"]:
         # For images, copy the binary file
         local_dest.write_bytes(file_path.read_bytes())
@@ -105,14 +117,21 @@ def _write_file_to_bucket_or_data_dir(file_path: Path, blob_name: str) -> bool:
     return True
 
 
-def _write_to_bucket_or_data_dir(content: str, blob_name: str) -> bool:
+def _write_to_bucket_or_data_dir(content: str | bytes, blob_name: str) -> bool:
     """
     Write content to a file in bucket if available, and also save locally for debugging.
     """
     # Always save locally for debugging
     local_path = DATA_PATH / blob_name
-    local_path.parent.mkdir(parents=True, exist_ok=True)
-    local_path.write_text(content)
+    ensure_directory(local_path.parent)
+    # Write to a temporary file then rename it: readers (e.g. the events cache check)
+    # only ever see a missing or a complete file, never a partially written one
+    tmp_path = local_path.with_name(f"{local_path.name}.{uuid.uuid4().hex}.tmp")
+    if isinstance(content, bytes):
+        tmp_path.write_bytes(content)
+    else:
+        tmp_path.write_text(content)
+    os.replace(tmp_path, local_path)
 
     # Also upload to bucket if available
     if has_bucket_access():
@@ -126,13 +145,13 @@ def _write_to_bucket_or_data_dir(content: str, blob_name: str) -> bool:
     return True
 
 
-def write_to_storage(file_path: Path, content: str) -> bool:
+def write_to_storage(file_path: Path, content: str | bytes) -> bool:
     """
     Write content to a file in storage at the given path relative to DATA_PATH.
 
     Args:
         file_path: Path object that must be relative to DATA_PATH
-        content: Content to write to the file
+        content: Content to write to the file, bytes are written as is (already encoded as UTF-8)
 
     Raises:
         ValueError: If the path is not relative to DATA_PATH
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+import pandas as pd
+from predibench.polymarket_api import Event, Market, MarketOutcome
+
+
+def make_market(market_id: str, prices: pd.Series | None = None) -> Market:
+    """Build a Yes/No market, with prices of its Yes outcome if given."""
+    return Market(
+        id=market_id,
+        question=f"Question {market_id}",
+        slug=market_id,
+        description="",
+        end_datetime=None,
+        creation_datetime=datetime(2025, 1, 1),
+        volumeNum=None,
+        volume24hr=None,
+        volume1wk=None,
+        volume1mo=None,
+        volume1yr=None,
+        liquidity=None,
+        outcomes=[
+            MarketOutcome(clob_token_id=f"{market_id}-yes", name="Yes", price=0.5),
+            MarketOutcome(clob_token_id=f"{market_id}-no", name="No", price=0.5),
+        ],
+        prices=prices,
+        price_outcome_name="Yes" if prices is not None else None,
+    )
+
+
+def make_event(
+    event_id: str,
+    markets: list[Market] | None = None,
+    n_markets: int = 1,
+    volume24hr: float = 5000,
+    slug: str = "",
+) -> Event:
+    """Build an event, with n_markets markets without prices unless markets are given."""
+    if markets is None:
+        markets = [make_market(f"{event_id}-{i}") for i in range(n_markets)]
+    return Event(
+        id=event_id,
+        slug=slug or f"event-{event_id}",
+        title=f"Event {event_id}",
+        creation_datetime=datetime(2025, 1, 1),
+        volume24hr=volume24hr,
+        markets=markets,
+    )
@@ -0,0 +1,44 @@
+import os
+from datetime import date, datetime, timedelta
+
+from predibench import invest
+from predibench.invest import run_investments_for_specific_date
+
+
+def test_reuse_final_cache_only_for_caches_written_after_the_window(
+    monkeypatch, tmp_path
+):
+    fetches = []
+    monkeypatch.setattr(
+        invest, "choose_events", lambda **kwargs: fetches.append(1) or []
+    )
+    monkeypatch.setattr(invest, "run_agent_investments", lambda **kwargs: [])
+    # Storage helpers only accept paths under DATA_PATH, the cache file is not read here
+    monkeypatch.setattr(invest, "load_events_from_file", lambda file_path: [])
+    monkeypatch.setattr(invest, "save_events_to_file", lambda events, file_path: None)
+    cache_file_path = tmp_path / "events_cache.json"
+    target_date = date(2025, 7, 1)
+    time_until_ending = timedelta(days=7)  # Window ends on 2025-07-08
+
+    def run(written_on: datetime, **kwargs) -> bool:
+        """Run with a cache written on the given day, return whether events were fetched."""
+        cache_file_path.write_text("[]")
+        os.utime(cache_file_path, (written_on.timestamp(), written_on.timestamp()))
+        fetches.clear()
+        run_investments_for_specific_date(
+            models=[],
+            max_n_events=3,
+            output_path=tmp_path,
+            time_until_ending=time_until_ending,
+            target_date=target_date,
+            cache_file_path=cache_file_path,
+            **kwargs,
+        )
+        return bool(fetches)
+
+    # Opt-in only: by default the cache is not reused
+    assert run(datetime(2025, 8, 1))
+    # Written during the window, prices could still change
+    assert run(datetime(2025, 7, 5), reuse_final_cache=True)
+    assert not run(datetime(2025, 8, 1), reuse_final_cache=True)
+    assert not run(datetime(2025, 7, 5), load_from_cache=True)
@@ -1,14 +1,139 @@
 from datetime import date, datetime, timedelta
 
 import pandas as pd
+from conftest import make_event
+from predibench import market_selection
 from predibench.common import DATA_PATH
 from predibench.logger_config import get_logger
-from predibench.market_selection import choose_events
+from predibench.market_selection import (
+    _remove_markets_without_prices_in_events,
+    choose_events,
+)
+from predibench.polymarket_api import Event, EventsRequestParameters
 from predibench.polymarket_data import load_events_from_file, save_events_to_file
 
 logger = get_logger(__name__)
 
 
+def _stub_polymarket(
+    monkeypatch, events: list[Event], markets_without_prices: set[str] = frozenset()
+) -> tuple[list[tuple], list[list[str]]]:
+    """Serve events by pages and fill prices offline, recording the requests made."""
+    requested_pages = []
+    price_batches = []
+
+    def get_events(self):
+        requested_pages.append((self.offset, self.limit))
+        return events[self.offset : self.offset + self.limit]
+
+    def fill_prices_of_markets(markets, end_datetime=None):
+        price_batches.append([market.id for market in markets])
+        for market in markets:
+            if market.id not in markets_without_prices:
+                market.prices = pd.Series([0.5], index=[date.today()])
+                market.price_outcome_name = "Yes"
+        return [market.prices is not None for market in markets]
+
+    monkeypatch.setattr(EventsRequestParameters, "get_events", get_events)
+    monkeypatch.setattr(
+        market_selection, "fill_prices_of_markets", fill_prices_of_markets
+    )
+    return requested_pages, price_batches
+
+
+def test_remove_markets_without_prices_in_events():
+    events = [
+        make_event("a", n_markets=2),
+        make_event("b"),
+        make_event("c", n_markets=3),
+    ]
+
+    kept_events = _remove_markets_without_prices_in_events(
+        events, [True, False, False, False, True, True]
+    )
+
+    assert [event.id for event in kept_events] == ["a", "c"]
+    assert [market.id for market in kept_events[0].markets] == ["a-0"]
+    assert [market.id for market in kept_events[1].markets] == ["c-1", "c-2"]
+
+
+def test_choose_events_filters_and_stops_early(monkeypatch):
+    events = [
+        make_event("0", slug="will-bitcoin-reach-100k"),
+        make_event("1"),
+        make_event("2", volume24hr=10),
+        make_event("3", n_markets=0),
+        make_event("4"),
+        make_event("5"),
+    ] + [make_event(str(i)) for i in range(6, 300)]
+    requested_pages, price_batches = _stub_polymarket(monkeypatch, events)
+
+    selected_events = choose_events(
+        target_date=date.today(), time_until_ending=timedelta(days=7), n_events=3
+    )
+
+    assert [event.id for event in selected_events] == ["1", "4", "5"]
+    # Prices are only fetched for the selected events, from the first page only
+    assert price_batches == [["1-0", "4-0", "5-0"]]
+    assert requested_pages == [(0, 100)]
+
+
+def test_choose_events_refills_events_without_prices(monkeypatch):
+    events = [make_event(str(i), n_markets=2) for i in range(10)]
+    _, price_batches = _stub_polymarket(
+        monkeypatch,
+        events,
+        # Event 1 loses all its markets, event 2 only one of them
+        markets_without_prices={"1-0", "1-1", "2-1"},
+    )
+
+    selected_events = choose_events(
+        target_date=date.today(), time_until_ending=timedelta(days=7), n_events=3
+    )
+
+    assert [event.id for event in selected_events] == ["0", "2", "3"]
+    assert [len(event.markets) for event in selected_events] == [2, 1, 2]
+    assert price_batches == [
+        ["0-0", "0-1", "1-0", "1-1", "2-0", "2-1"],
+        ["3-0", "3-1"],
+    ]
+
+
+def test_choose_events_returns_fewer_events_when_candidates_run_out(monkeypatch):
+    events = [make_event(str(i)) for i in range(4)]
+    requested_pages, price_batches = _stub_polymarket(
+        monkeypatch, events, markets_without_prices={"1-0", "3-0"}
+    )
+
+    selected_events = choose_events(
+        target_date=date.today(), time_until_ending=timedelta(days=7), n_events=3
+    )
+
+    assert [event.id for event in selected_events] == ["0", "2"]
+    assert price_batches == [["0-0", "1-0", "2-0"], ["3-0"]]
+    assert requested_pages == [(0, 100)]
+
+
+def test_choose_events_saves_before_returning(monkeypatch):
+    _stub_polymarket(monkeypatch, [make_event(str(i)) for i in range(5)])
+    save_path = DATA_PATH / "test_choose_events_saved.json"
+
+    selected_events = choose_events(
+        target_date=date.today(),
+        time_until_ending=timedelta(days=7),
+        n_events=2,
+        save_path=save_path,
+    )
+
+    try:
+        loaded_events = load_events_from_file(save_path)
+        assert [event.id for event in loaded_events] == [
+            event.id for event in selected_events
+        ]
+    finally:
+        save_path.unlink()
+
+
 def test_choose_events_event_caching_e2e():
     """End-to-end test for event save/load functionality."""
 
@@ -50,7 +175,7 @@ def test_choose_events_event_caching_e2e():
             else:
                 nb_markets_without_prices += 1
     assert (
-        nb_markets_with_prices > 3 
+        nb_markets_with_prices > 3
     )  # NOTE: There are 3 events, so at least 3 markets should have prices
     assert nb_markets_without_prices == 0
     assert (
@@ -1,5 +1,11 @@
 from datetime import datetime
+from itertools import islice
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
 
+import requests
+from conftest import make_event
+from predibench import polymarket_api
 from predibench.polymarket_api import (
     EventsRequestParameters,
     MarketsRequestParameters,
@@ -8,6 +14,94 @@ from predibench.polymarket_api import (
 )
 
 
+def _stub_get_events(monkeypatch, n_events: int, shift: int = 0) -> list[tuple]:
+    """Serve n_events events by offset and limit, recording the pages requested.
+
+    With shift, every page after the first starts shift events earlier, as when the ordering
+    changes between two requests.
+    """
+    requested_pages = []
+
+    def get_events(self):
+        requested_pages.append((self.offset, self.limit))
+        start = max(self.offset - shift, 0) if self.offset else 0
+        return [
+            make_event(str(i), n_markets=0)
+            for i in range(start, min(start + self.limit, n_events))
+        ]
+
+    monkeypatch.setattr(EventsRequestParameters, "get_events", get_events)
+    return requested_pages
+
+
+def test_list_of_ids_is_sent_as_repeated_parameters(monkeypatch):
+    requested_urls = []
+
+    def get(url, params):
+        requested_urls.append(requests.Request("GET", url, params=params).prepare().url)
+        return SimpleNamespace(raise_for_status=lambda: None, content=b"[]")
+
+    monkeypatch.setattr(polymarket_api._POLYMARKET_SESSION, "get", get)
+
+    assert EventsRequestParameters(id=[12, 34, 56]).get_events() == []
+    assert MarketsRequestParameters(id=[7, 8]).get_markets() == []
+
+    assert parse_qs(urlparse(requested_urls[0]).query) == {"id": ["12", "34", "56"]}
+    assert parse_qs(urlparse(requested_urls[1]).query) == {"id": ["7", "8"]}
+
+
+def test_iter_events_pages_up_to_limit(monkeypatch):
+    requested_pages = _stub_get_events(monkeypatch, n_events=1000)
+
+    events = list(EventsRequestParameters(limit=250).iter_events(page_size=100))
+
+    assert [event.id for event in events] == [str(i) for i in range(250)]
+    assert requested_pages == [(0, 100), (100, 100), (200, 50)]
+
+
+def test_iter_events_stops_on_short_page(monkeypatch):
+    requested_pages = _stub_get_events(monkeypatch, n_events=130)
+
+    events = list(EventsRequestParameters(limit=500).iter_events(page_size=100))
+
+    assert len(events) == 130
+    assert requested_pages == [(0, 100), (100, 100)]
+
+
+def test_iter_events_starts_at_offset(monkeypatch):
+    requested_pages = _stub_get_events(monkeypatch, n_events=1000)
+
+    events = list(EventsRequestParameters(offset=30, limit=120).iter_events(100))
+
+    assert [event.id for event in events] == [str(i) for i in range(30, 150)]
+    assert requested_pages == [(30, 100), (130, 20)]
+
+
+def test_iter_events_skips_events_repeated_across_pages(monkeypatch):
+    # Each page after the first starts 5 events earlier than its offset
+    requested_pages = _stub_get_events(monkeypatch, n_events=230, shift=5)
+
+    event_ids = [
+        event.id
+        for event in EventsRequestParameters(limit=500).iter_events(page_size=100)
+    ]
+
+    assert len(event_ids) == len(set(event_ids))
+    assert event_ids == [str(i) for i in range(230)]
+    assert requested_pages == [(0, 100), (100, 100), (200, 100)]
+
+
+def test_iter_events_only_fetches_consumed_pages(monkeypatch):
+    requested_pages = _stub_get_events(monkeypatch, n_events=1000)
+
+    events = list(
+        islice(EventsRequestParameters(limit=500).iter_events(page_size=100), 20)
+    )
+
+    assert len(events) == 20
+    assert requested_pages == [(0, 100)]
+
+
 def test_get_open_markets():
     """Test basic market retrieval."""
     request_parameters = MarketsRequestParameters(limit=10)
@@ -1,14 +1,294 @@
 import json
-from datetime import date
+from datetime import date, timedelta
 
+import httpx
+import pandas as pd
+import pytest
+from conftest import make_event, make_market
 from datasets import load_dataset
+from huggingface_hub import DatasetCard, HfApi
+from huggingface_hub.errors import HfHubHTTPError, RepositoryNotFoundError
+from predibench.agent import runner
 from predibench.agent.dataclasses import (
     EventInvestmentDecisions,
     MarketInvestmentDecision,
     ModelInvestmentDecisions,
     SingleModelDecision,
 )
-from predibench.agent.runner import _upload_results_to_hf_dataset
+from predibench.agent.runner import (
+    _build_event_prompt,
+    _increment_split_size,
+    _is_transient_hub_error,
+    _split_has_files,
+    _upload_results_to_hf_dataset,
+    run_agent_investments,
+)
+from predibench.polymarket_api import Event
+
+
+def _daily_prices(first_day: date, n_days: int) -> pd.Series:
+    days = [first_day + timedelta(days=i) for i in range(n_days)]
+    # Same index type as fill_prices: an object index of datetime.date
+    return pd.Series([0.5 + i / 100 for i in range(n_days)], index=days)
+
+
+def _price_days(recent_prices: str) -> list[date]:
+    return [date.fromisoformat(line.split()[0]) for line in recent_prices.splitlines()]
+
+
+def test_build_event_prompt_with_different_price_ranges():
+    # Market "a" starts after market "b", and ends after it
+    event = make_event(
+        "event",
+        markets=[
+            make_market("a", _daily_prices(date(2025, 8, 10), 10)),  # 08-10 -> 08-19
+            make_market("b", _daily_prices(date(2025, 8, 1), 15)),  # 08-01 -> 08-15
+        ],
+    )
+
+    # Backward mode: the history of each market stops at the target date, and keeps its start
+    _, market_data = _build_event_prompt(event, date(2025, 8, 12), backward_mode=True)
+    assert _price_days(market_data["b"]["recent_prices"]) == [
+        date(2025, 8, 1) + timedelta(days=i) for i in range(12)
+    ]
+    assert _price_days(market_data["a"]["recent_prices"]) == [
+        date(2025, 8, 10),
+        date(2025, 8, 11),
+        date(2025, 8, 12),
+    ]
+    assert market_data["a"]["current_price"] == 0.52
+
+    # Backward mode before market "a" exists: no future price leaks into market "b"
+    _, market_data = _build_event_prompt(event, date(2025, 8, 5), backward_mode=True)
+    assert max(_price_days(market_data["b"]["recent_prices"])) == date(2025, 8, 5)
+    assert market_data["a"]["is_closed"]
+
+    # Live mode: the most recent prices come last, in chronological order
+    _, market_data = _build_event_prompt(
+        event, date(2025, 8, 12), backward_mode=False, price_history_limit=5
+    )
+    assert _price_days(market_data["b"]["recent_prices"]) == [
+        date(2025, 8, 11) + timedelta(days=i) for i in range(5)
+    ]
+
+
+def _stub_event_investment(model, event, target_date, **kwargs):
+    return EventInvestmentDecisions(
+        event_id=event.id,
+        event_title=event.title,
+        market_investment_decisions=[],
+    )
+
+
+def _make_priced_event(event_id: str) -> Event:
+    """Build an event whose market has prices, as agents only see priced markets."""
+    return make_event(
+        event_id,
+        markets=[make_market(f"{event_id}-0", _daily_prices(date(2025, 8, 1), 15))],
+    )
+
+
+def test_run_agent_investments_raises_failed_uploads(monkeypatch):
+    monkeypatch.setattr(runner, "_process_event_investment", _stub_event_investment)
+    uploaded_models = []
+
+    def failing_upload(results_per_model, **kwargs):
+        model_id = results_per_model[0].model_id
+        if model_id == "broken_model":
+            raise OSError("Hub unreachable")
+        uploaded_models.append(model_id)
+
+    monkeypatch.setattr(runner, "_upload_results_to_hf_dataset", failing_upload)
+
+    run_kwargs = dict(
+        events=[_make_priced_event("1"), _make_priced_event("2")],
+        target_date=date(2025, 8, 10),
+        date_output_path=None,
+        split="test",
+        timestamp_for_saving="timestamp",
+        dataset_name="Sibyllic/dummy",
+    )
+    results = run_agent_investments(models=["model_a", "model_b"], **run_kwargs)
+    assert [result.model_id for result in results] == ["model_a", "model_b"]
+    assert sorted(uploaded_models) == ["model_a", "model_b"]
+
+    # The upload of the other model still completes before the error is raised
+    uploaded_models.clear()
+    with pytest.raises(OSError, match="Hub unreachable"):
+        run_agent_investments(models=["broken_model", "model_a"], **run_kwargs)
+    assert uploaded_models == ["model_a"]
+
+
+def test_run_agent_investments_skips_failed_events(monkeypatch):
+    def flaky_event_investment(model, event, target_date, **kwargs):
+        if event.id == "3":
+            raise RuntimeError("Agent crashed")
+        return _stub_event_investment(model, event, target_date)
+
+    monkeypatch.setattr(runner, "_process_event_investment", flaky_event_investment)
+    uploaded_event_ids = []
+
+    def record_upload(results_per_model, **kwargs):
+        for event_decisions in results_per_model[0].event_investment_decisions:
+            uploaded_event_ids.append(event_decisions.event_id)
+
+    monkeypatch.setattr(runner, "_upload_results_to_hf_dataset", record_upload)
+
+    results = run_agent_investments(
+        models=["model_a"],
+        events=[_make_priced_event(event_id) for event_id in ["1", "2", "3", "4"]],
+        target_date=date(2025, 8, 10),
+        date_output_path=None,
+        split="test",
+        timestamp_for_saving="timestamp",
+        dataset_name="Sibyllic/dummy",
+    )
+    assert len(results) == 1
+    event_ids = [
+        event_decisions.event_id
+        for event_decisions in results[0].event_investment_decisions
+    ]
+    assert event_ids == ["1", "2", "4"]
+    assert uploaded_event_ids == ["1", "2", "4"]
+
+
+_DATASET_CARD = """---
+dataset_info:
+  features:
+  - name: model_id
+    dtype: string
+  splits:
+  - name: train
+    num_bytes: 1000
+    num_examples: 10
+  - name: test
+    num_bytes: 200
+    num_examples: 2
+---
+"""
+
+
+def _hub_error(error_class: type[HfHubHTTPError], status_code: int) -> HfHubHTTPError:
+    request = httpx.Request("GET", "https://huggingface.co/api/datasets/Sibyllic/dummy")
+    return error_class(
+        f"{status_code} error", response=httpx.Response(status_code, request=request)
+    )
+
+
+def test_is_transient_hub_error():
+    assert _is_transient_hub_error(_hub_error(HfHubHTTPError, 429))
+    assert _is_transient_hub_error(_hub_error(HfHubHTTPError, 503))
+    assert _is_transient_hub_error(httpx.ConnectError("connection refused"))
+    assert _is_transient_hub_error(httpx.ReadTimeout("timed out"))
+    assert not _is_transient_hub_error(_hub_error(HfHubHTTPError, 401))
+    assert not _is_transient_hub_error(_hub_error(HfHubHTTPError, 403))
+    assert not _is_transient_hub_error(_hub_error(RepositoryNotFoundError, 404))
+    assert not _is_transient_hub_error(ValueError("bad value"))
+
+
+def test_split_has_files_does_not_retry_missing_repo(monkeypatch):
+    calls = []
+
+    def list_repo_files(self, repo_id, repo_type=None):
+        calls.append(repo_id)
+        raise _hub_error(RepositoryNotFoundError, 404)
+
+    monkeypatch.setattr(HfApi, "list_repo_files", list_repo_files)
+
+    assert not _split_has_files("Sibyllic/dummy", "train")
+    assert calls == ["Sibyllic/dummy"]
+
+
+def test_increment_split_size():
+    card = DatasetCard(_DATASET_CARD)
+
+    assert _increment_split_size(card, "test", 3)
+    assert not _increment_split_size(card, "validation", 3)
+
+    splits = card.data["dataset_info"]["splits"]
+    assert [split["num_examples"] for split in splits] == [10, 5]
+    # The update is kept when the card is written back
+    assert "num_examples: 5" in str(card)
+
+
+def test_increment_split_size_without_dataset_info():
+    assert not _increment_split_size(
+        DatasetCard("---\nlicense: mit\n---\n"), "train", 3
+    )
+
+
+def test_upload_pushes_only_splits_without_files(monkeypatch):
+    """push_to_hub replaces the files of a split, so it must not be used for a split with files."""
+    pushed = []
+    monkeypatch.setattr(runner, "_split_has_files", lambda dataset_name, split: True)
+    monkeypatch.setattr(
+        runner,
+        "_get_dataset_card",
+        lambda dataset_name: (DatasetCard(_DATASET_CARD), "sha"),
+    )
+    monkeypatch.setattr(
+        "datasets.Dataset.push_to_hub", lambda self, *args, **kwargs: pushed.append(1)
+    )
+    result = ModelInvestmentDecisions(
+        model_id="test_model",
+        target_date=date(2025, 8, 21),
+        event_investment_decisions=[
+            _stub_event_investment("test_model", _make_priced_event("1"), date(2025, 8, 21))
+        ],
+    )
+
+    with pytest.raises(ValueError, match="cannot append rows"):
+        _upload_results_to_hf_dataset(
+            [result], date(2025, 8, 21), dataset_name="Sibyllic/dummy", split="other"
+        )
+    assert pushed == []
+
+    # Without any file for the split, push_to_hub creates it
+    monkeypatch.setattr(runner, "_split_has_files", lambda dataset_name, split: False)
+    _upload_results_to_hf_dataset(
+        [result], date(2025, 8, 21), dataset_name="Sibyllic/dummy", split="other"
+    )
+    assert pushed == [1]
+
+
+def test_append_rereads_card_on_concurrent_commit(monkeypatch):
+    card_reads = []
+
+    def get_dataset_card(dataset_name):
+        card_reads.append(dataset_name)
+        # A concurrent append between the two reads added 5 rows to the test split
+        card = _DATASET_CARD.replace("num_examples: 2", "num_examples: 7")
+        return DatasetCard(card if len(card_reads) > 1 else _DATASET_CARD), (
+            f"sha{len(card_reads)}"
+        )
+
+    uploads = []
+
+    def upload_folder(self, *, folder_path, parent_commit, **kwargs):
+        uploads.append(parent_commit)
+        if parent_commit == "sha1":
+            raise _hub_error(HfHubHTTPError, 412)
+        card = DatasetCard.load(f"{folder_path}/README.md")
+        splits = card.data["dataset_info"]["splits"]
+        assert [split["num_examples"] for split in splits] == [10, 8]
+
+    monkeypatch.setattr(runner, "_split_has_files", lambda dataset_name, split: True)
+    monkeypatch.setattr(runner, "_get_dataset_card", get_dataset_card)
+    # The test card only declares a model_id column, skip casting to its schema
+    monkeypatch.setattr(runner, "_get_card_features", lambda card: None)
+    monkeypatch.setattr(HfApi, "upload_folder", upload_folder)
+    result = ModelInvestmentDecisions(
+        model_id="test_model",
+        target_date=date(2025, 8, 21),
+        event_investment_decisions=[
+            _stub_event_investment("test_model", _make_priced_event("1"), date(2025, 8, 21))
+        ],
+    )
+
+    _upload_results_to_hf_dataset(
+        [result], date(2025, 8, 21), dataset_name="Sibyllic/dummy", split="test"
+    )
+    assert uploads == ["sha1", "sha2"]
 
 
 def test_upload_results_to_hf_dataset():
@@ -0,0 +1,134 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from predibench.agent import smolagents_utils
+from predibench.agent.smolagents_utils import (
+    _format_search_result,
+    _truncate_observation,
+    _truncate_old_observations,
+    run_smolagents_batch,
+)
+from smolagents import ActionStep
+from smolagents.monitoring import Timing
+
+
+class _StubAgent:
+    """Agent returning a fixed output after a delay, or raising it if it is an exception."""
+
+    def __init__(self, output, delay: float = 0.0):
+        self.output = output
+        self.delay = delay
+        self.interrupted = threading.Event()
+
+    def run(self, prompt: str):
+        time.sleep(self.delay)
+        if isinstance(self.output, Exception):
+            raise self.output
+        return SimpleNamespace(output=self.output)
+
+    def interrupt(self):
+        self.interrupted.set()
+
+
+def _run_batch(monkeypatch, agents: list[_StubAgent], strategy: str):
+    built_agents = iter(agents)
+    monkeypatch.setattr(
+        smolagents_utils, "_build_agent", lambda **kwargs: next(built_agents)
+    )
+    return run_smolagents_batch(
+        model=None,
+        question="question",
+        cutoff_date=None,
+        search_provider="serpapi",
+        search_api_key="key",
+        max_steps=5,
+        n_jobs=len(agents),
+        strategy=strategy,
+    )
+
+
+def test_run_smolagents_batch_first_success_does_not_wait_for_other_runs(monkeypatch):
+    slow_agent = _StubAgent(["slow decisions"], delay=2.0)
+    failed_agent = _StubAgent("No final answer")  # Text output: max_steps reached
+    fast_agent = _StubAgent(["fast decisions"], delay=0.1)
+
+    start = time.monotonic()
+    output = _run_batch(
+        monkeypatch, [slow_agent, failed_agent, fast_agent], "first_success"
+    )
+
+    assert output == ["fast decisions"]
+    assert time.monotonic() - start < 1.0
+    assert slow_agent.interrupted.is_set()
+
+
+def test_run_smolagents_batch_all_finished_returns_first_in_launch_order(monkeypatch):
+    agents = [
+        _StubAgent(RuntimeError("LLM error"), delay=0.1),
+        _StubAgent(["second decisions"], delay=0.3),
+        _StubAgent(["third decisions"]),
+    ]
+
+    start = time.monotonic()
+    output = _run_batch(monkeypatch, agents, "all_finished")
+
+    assert output == ["second decisions"]
+    assert time.monotonic() - start >= 0.3
+
+
+@pytest.mark.parametrize("strategy", ["first_success", "all_finished"])
+def test_run_smolagents_batch_all_runs_fail(monkeypatch, strategy):
+    agents = [_StubAgent("No final answer"), _StubAgent(RuntimeError("LLM error"))]
+
+    with pytest.raises(RuntimeError, match="None of the 2 agent runs") as error:
+        _run_batch(monkeypatch, agents, strategy)
+    assert str(error.value.__cause__) == "LLM error"
+
+
+def test_run_smolagents_batch_unknown_strategy(monkeypatch):
+    with pytest.raises(ValueError, match="Unknown strategy"):
+        _run_batch(monkeypatch, [_StubAgent(["decisions"])], "fastest")
+
+
+def _search_observation(n_results: int) -> str:
+    return "## Search Results for 'query'\n" + "\n\n".join(
+        _format_search_result(
+            idx, {"title": f"Title {idx}", "link": "https://a.b", "snippet": "x" * 100}
+        )
+        for idx in range(n_results)
+    )
+
+
+def test_truncate_observation_keeps_whole_entries():
+    observation = _search_observation(5)
+    two_results = _search_observation(2)
+
+    truncated = _truncate_observation(observation, max_chars=len(two_results) + 50)
+
+    assert truncated == two_results + "\n[... 3 more entries truncated]"
+    # Truncating again leaves the observation unchanged
+    assert (
+        _truncate_observation(truncated, max_chars=len(two_results) + 50) == truncated
+    )
+    assert _truncate_observation(observation, max_chars=len(observation)) == observation
+    # Text without entries is never cut in the middle
+    assert _truncate_observation("x" * 1000, max_chars=100) == "x" * 1000
+
+
+def test_truncate_old_observations_keeps_recent_steps():
+    steps = [
+        ActionStep(
+            step_number=i,
+            timing=Timing(start_time=0),
+            observations=_search_observation(5),
+        )
+        for i in range(3)
+    ]
+    agent = SimpleNamespace(memory=SimpleNamespace(steps=steps))
+
+    _truncate_old_observations(steps[-1], agent, max_chars=300)
+
+    assert steps[0].observations.endswith("more entries truncated]")
+    assert steps[1].observations == steps[2].observations == _search_observation(5)